@@ -0,0 +1,204 @@
+import time
+from typing import Any, Dict, List
+
+from starlette.routing import Mount
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from nb_cli_plugin_webui.models.domain.process import LogRecord
+from nb_cli_plugin_webui.utils.performance import get_io_totals
+from nb_cli_plugin_webui.api.dependencies.performance import HostMetricsStore
+from nb_cli_plugin_webui.api.dependencies.process.manager import ProcessManager
+from nb_cli_plugin_webui.api.dependencies.process.log import LoggerStorageFather
+from nb_cli_plugin_webui.utils.metrics import Histogram, MetricSample, MetricsWriter
+
+METRICS_NAMESPACE = "nb_webui"
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUEST_DURATION = Histogram(("method", "route", "status"))
+
+
+class HTTPMetricsMiddleware(BaseHTTPMiddleware):
+    """按路由模板统计 HTTP 请求耗时，路由模板而非实际路径作为标签以限制序列数量"""
+
+    _route_paths: Dict[Any, str] = dict()
+
+    def _get_route_path(self, request: Request) -> str:
+        endpoint = request.scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+
+        route_paths = self._route_paths
+        if endpoint not in route_paths:
+            for route in request.app.routes:
+                target = route.app if isinstance(route, Mount) else route.endpoint
+                route_paths.setdefault(target, route.path or "/")
+        return route_paths.get(endpoint, UNMATCHED_ROUTE)
+
+    async def dispatch(self, request, call_next) -> Response:
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                request.method,
+                self._get_route_path(request),
+                str(status_code),
+            )
+
+
+def _collect_host_metrics(writer: MetricsWriter) -> None:
+    latest = HostMetricsStore.latest
+    if latest:
+        writer.add_value(
+            "host_cpu_percent", "gauge", "Host CPU usage percent.", latest["cpu"]
+        )
+        writer.add_value(
+            "host_memory_percent", "gauge", "Host memory usage percent.", latest["mem"]
+        )
+        writer.add_value(
+            "host_disk_percent", "gauge", "Root disk usage percent.", latest["disk"]
+        )
+
+    totals = get_io_totals()
+    writer.add(
+        "host_disk_bytes_total",
+        "counter",
+        "Host disk bytes read and written.",
+        [
+            (str(), {"direction": "read"}, totals["disk_read"]),
+            (str(), {"direction": "write"}, totals["disk_write"]),
+        ],
+    )
+    writer.add(
+        "host_network_bytes_total",
+        "counter",
+        "Host network bytes sent and received.",
+        [
+            (str(), {"direction": "sent"}, totals["net_sent"]),
+            (str(), {"direction": "recv"}, totals["net_recv"]),
+        ],
+    )
+
+
+def _collect_process_metrics(writer: MetricsWriter) -> None:
+    up: List[MetricSample] = list()
+    cpu: List[MetricSample] = list()
+    mem: List[MetricSample] = list()
+    restarts: List[MetricSample] = list()
+    healthy: List[MetricSample] = list()
+    resources: Dict[str, List[MetricSample]] = {
+        "rss": list(),
+        "cpu_time": list(),
+        "threads": list(),
+        "fds": list(),
+        "processes": list(),
+        "io_read": list(),
+        "io_write": list(),
+    }
+
+    for project_id, process in list(ProcessManager.processes.items()):
+        labels = {"project_id": project_id}
+        up.append((str(), labels, int(process.process_is_running)))
+
+        sampler = process.status_sampler
+        performance = sampler.latest.performance if sampler.latest else None
+        if process.process_is_running and performance:
+            cpu.append((str(), labels, performance.cpu))
+            mem.append((str(), labels, performance.mem))
+            for key, value in sampler.resources.items():
+                if key in resources:
+                    resources[key].append((str(), labels, value))
+
+        if process.supervisor:
+            restarts.append((str(), labels, process.supervisor.restart_count))
+        if process.health.enabled and process.health.healthy is not None:
+            healthy.append((str(), labels, int(process.health.healthy)))
+
+    writer.add("bot_up", "gauge", "Whether the bot process is running.", up)
+    writer.add("bot_cpu_percent", "gauge", "Bot process tree CPU percent.", cpu)
+    writer.add("bot_memory_percent", "gauge", "Bot process tree memory percent.", mem)
+    writer.add(
+        "bot_resident_memory_bytes",
+        "gauge",
+        "Bot process tree resident memory.",
+        resources["rss"],
+    )
+    writer.add(
+        "bot_cpu_seconds_total",
+        "counter",
+        "Bot process tree user and system CPU time.",
+        resources["cpu_time"],
+    )
+    writer.add(
+        "bot_threads", "gauge", "Bot process tree thread count.", resources["threads"]
+    )
+    writer.add(
+        "bot_open_fds",
+        "gauge",
+        "Bot process tree open file descriptors or handles.",
+        resources["fds"],
+    )
+    writer.add(
+        "bot_processes",
+        "gauge",
+        "Number of processes in the bot process tree.",
+        resources["processes"],
+    )
+    writer.add(
+        "bot_io_read_bytes_total",
+        "counter",
+        "Bot process tree bytes read.",
+        resources["io_read"],
+    )
+    writer.add(
+        "bot_io_write_bytes_total",
+        "counter",
+        "Bot process tree bytes written.",
+        resources["io_write"],
+    )
+    writer.add(
+        "bot_restarts_total",
+        "counter",
+        "Automatic restarts by the supervisor.",
+        restarts,
+    )
+    writer.add("bot_healthy", "gauge", "Result of the last health probe.", healthy)
+
+
+def _collect_log_metrics(writer: MetricsWriter) -> None:
+    total: List[MetricSample] = list()
+    retained: List[MetricSample] = list()
+    subscribers: List[MetricSample] = list()
+    for key, storage in list(LoggerStorageFather[LogRecord].storages.items()):
+        labels = {"storage": key}
+        total.append((str(), labels, storage.total_count))
+        retained.append((str(), labels, storage.last_seq - storage.first_seq + 1))
+        subscribers.append((str(), labels, len(storage.subscribers)))
+
+    writer.add("log_records_total", "counter", "Log records ingested.", total)
+    writer.add("log_records_retained", "gauge", "Log records held in memory.", retained)
+    writer.add(
+        "log_subscribers", "gauge", "Active log stream subscribers.", subscribers
+    )
+
+
+def collect_metrics() -> str:
+    """汇总当前指标，仅读取各采样器缓存的结果，不会触发新的采样"""
+
+    writer = MetricsWriter(METRICS_NAMESPACE)
+    _collect_host_metrics(writer)
+    _collect_process_metrics(writer)
+    _collect_log_metrics(writer)
+    writer.add(
+        "http_request_duration_seconds",
+        "histogram",
+        "HTTP request latency by route template.",
+        HTTP_REQUEST_DURATION.collect(),
+    )
+    return writer.render()
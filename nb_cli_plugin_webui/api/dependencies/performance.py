@@ -1,5 +1,27 @@
-from nb_cli_plugin_webui.utils.performance import PerformanceMonitor
+import json
+import asyncio
+from pathlib import Path
+from typing import Any, Set, Dict, List, Optional
+
+from nb_cli_plugin_webui.core.log import logger as log
+from nb_cli_plugin_webui.utils.store import get_data_file
+from nb_cli_plugin_webui.utils.apscheduler import scheduler
+from nb_cli_plugin_webui.utils.timeseries import TieredTimeSeries
 from nb_cli_plugin_webui.models.schemas.performance import SystemStats
+from nb_cli_plugin_webui.utils.performance import PerformanceMonitor, get_host_metrics
+
+SYSTEM_STATS_INTERVAL: float = 1
+HOST_METRICS_INTERVAL: float = 1
+HOST_METRICS_SAVE_INTERVAL: float = 60
+HOST_METRICS_FIELDS = (
+    "cpu",
+    "mem",
+    "disk",
+    "disk_read",
+    "disk_write",
+    "net_sent",
+    "net_recv",
+)
 
 
 async def get_system_stats() -> SystemStats:
@@ -11,3 +33,172 @@ async def get_system_stats() -> SystemStats:
         disk=data.get_disk_info(),
         net=data.get_net_info(),
     )
+
+
+def flatten_stats(data: Dict[str, Any], prefix: str = str()) -> Dict[str, Any]:
+    """将嵌套的状态展开为以 `.` 连接的键，列表视为单个值"""
+
+    result: Dict[str, Any] = dict()
+    for key, value in data.items():
+        if isinstance(value, dict):
+            result.update(flatten_stats(value, f"{prefix}{key}."))
+        else:
+            result[prefix + key] = value
+    return result
+
+
+def unflatten_stats(data: Dict[str, Any]) -> Dict[str, Any]:
+    result: Dict[str, Any] = dict()
+    for key, value in data.items():
+        *parents, name = key.split(".")
+        node = result
+        for parent in parents:
+            node = node.setdefault(parent, dict())
+        node[name] = value
+    return result
+
+
+class SystemStatsDeltaEncoder:
+    """增量编码系统状态，首次返回全部字段，之后仅返回发生变化的字段
+
+    Args:
+        - fields (Optional[List[str]]): 需要的字段，如 `cpu`、`mem.percent`，为空时为全部字段
+    """
+
+    def __init__(self, fields: Optional[List[str]] = None) -> None:
+        self.fields = [field.strip() for field in fields or list() if field.strip()]
+        self._last: Optional[Dict[str, Any]] = None
+
+    def _select(self, flat: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.fields:
+            return flat
+        return {
+            key: value
+            for key, value in flat.items()
+            if any(key == f or key.startswith(f + ".") for f in self.fields)
+        }
+
+    def encode(self, flat: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """编码一次采样
+
+        Args:
+            - flat (Dict[str, Any]): `flatten_stats` 展开后的系统状态
+
+        Returns:
+            Optional[Dict[str, Any]]: 需发送的数据，没有变化时为 None
+        """
+
+        selected = self._select(flat)
+        last, self._last = self._last, selected
+        if last is None:
+            return {"full": True, "system_stats": unflatten_stats(selected)}
+
+        changed = {k: v for k, v in selected.items() if last.get(k) != v}
+        if not changed:
+            return None
+        return {"full": False, "system_stats": unflatten_stats(changed)}
+
+
+class SystemStatsSampler:
+    """系统状态采样器，每个间隔只采样一次并广播给所有订阅者"""
+
+    latest: Optional[SystemStats] = None
+    # Flattened once per tick and shared by every delta stream
+    latest_flat: Dict[str, Any] = dict()
+    subscribers: Set["asyncio.Queue[SystemStats]"] = set()
+
+    @classmethod
+    def subscribe(cls) -> "asyncio.Queue[SystemStats]":
+        queue: "asyncio.Queue[SystemStats]" = asyncio.Queue(maxsize=1)
+        if cls.latest:
+            queue.put_nowait(cls.latest)
+        cls.subscribers.add(queue)
+        return queue
+
+    @classmethod
+    def unsubscribe(cls, queue: "asyncio.Queue[SystemStats]") -> None:
+        cls.subscribers.discard(queue)
+
+    @classmethod
+    async def sample(cls) -> SystemStats:
+        cls.latest = await get_system_stats()
+        cls.latest_flat = flatten_stats(cls.latest.dict())
+        for queue in cls.subscribers:
+            # Slow subscribers only ever see the newest snapshot
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(cls.latest)
+        return cls.latest
+
+
+@scheduler.scheduled_job(
+    "interval",
+    seconds=SYSTEM_STATS_INTERVAL,
+    misfire_grace_time=15,
+    max_instances=1,
+    coalesce=True,
+)
+async def sample_system_stats():
+    if SystemStatsSampler.subscribers:
+        await SystemStatsSampler.sample()
+
+
+class HostMetricsStore:
+    """主机指标时间序列，持续记录并定期保存至数据目录，WebUI 重启后可查询此前的数据"""
+
+    metrics_file_name = "webui-host-metrics.json"
+    history = TieredTimeSeries(HOST_METRICS_FIELDS)
+    latest: Dict[str, float] = dict()
+
+    @classmethod
+    def get_metrics_file(cls) -> Path:
+        return get_data_file(cls.metrics_file_name)
+
+    @classmethod
+    def load(cls) -> None:
+        try:
+            data = json.loads(cls.get_metrics_file().read_text(encoding="utf-8"))
+            cls.history.load(data)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, TypeError, KeyError, IndexError) as err:
+            log.warning(f"Load host metrics failed: {err}")
+
+    @classmethod
+    def _write(cls, data: str) -> None:
+        try:
+            cls.get_metrics_file().write_text(data, encoding="utf-8")
+        except OSError as err:
+            log.warning(f"Save host metrics failed: {err}")
+
+    @classmethod
+    def save(cls) -> None:
+        cls._write(json.dumps(cls.history.dump(), separators=(",", ":")))
+
+    @classmethod
+    async def save_async(cls) -> None:
+        # Dump in the event loop so the buffers are not modified while copying
+        data = json.dumps(cls.history.dump(), separators=(",", ":"))
+        await asyncio.get_running_loop().run_in_executor(None, cls._write, data)
+
+
+@scheduler.scheduled_job(
+    "interval",
+    seconds=HOST_METRICS_INTERVAL,
+    misfire_grace_time=15,
+    max_instances=1,
+    coalesce=True,
+)
+async def record_host_metrics():
+    metrics = get_host_metrics()
+    HostMetricsStore.latest = metrics
+    # Skip the first ticks, a rate without a previous sample is not a real value
+    if all(field in metrics for field in HOST_METRICS_FIELDS):
+        HostMetricsStore.history.add(metrics)
+
+
+@scheduler.scheduled_job(
+    "interval", seconds=HOST_METRICS_SAVE_INTERVAL, misfire_grace_time=15
+)
+async def save_host_metrics():
+    await HostMetricsStore.save_async()
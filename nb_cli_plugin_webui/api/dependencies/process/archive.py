@@ -0,0 +1,304 @@
+import gzip
+import json
+import time
+import asyncio
+from pathlib import Path
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Iterator, Optional
+
+from pydantic import BaseModel
+
+from nb_cli_plugin_webui.utils.store import get_data_dir
+from nb_cli_plugin_webui.models.domain.process import (
+    LogRecord,
+    LogArchiveIndex,
+    LogArchiveSegment,
+    LogArchiveCheckpoint,
+)
+
+DEFAULT_SEGMENT_SIZE: int = 4 * 1024 * 1024
+DEFAULT_RETENTION_TIME: float = 7 * 24 * 60 * 60
+DEFAULT_FLUSH_INTERVAL: float = 1
+DEFAULT_CHECKPOINT_INTERVAL: int = 256
+
+
+class LogArchive:
+    """按项目分段追加写入的日志归档
+
+    写入在事件循环外批量完成，写满的分段会被压缩。
+    索引记录每个分段的首尾序号及时间，并在分段内每隔固定条数记录一个检查点，
+    压缩时每个检查点开始一个独立的 gzip 成员，按范围查询时只需从最近的检查点读起。
+    """
+
+    index_file_name = "index.json"
+
+    def __init__(
+        self,
+        key: str,
+        *,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        retention_time: float = DEFAULT_RETENTION_TIME,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+    ) -> None:
+        self.key = key
+        self.segment_size = segment_size
+        self.retention_time = retention_time
+        self.flush_interval = flush_interval
+        self.checkpoint_interval = checkpoint_interval
+
+        self.path = get_data_dir() / "logs" / key
+        # Filled by `load`, the writer replaces it instead of mutating it in place
+        self.index = LogArchiveIndex(segments=list())
+
+        self._loaded = False
+        self._pending: List[Dict[str, Any]] = list()
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def last_seq(self) -> int:
+        if self._pending:
+            return self._pending[-1]["seq"]
+        if self.index.segments:
+            return self.index.segments[-1].last_seq
+        return 0
+
+    async def load(self) -> None:
+        """在事件循环外读取索引，重复调用时不会再次读取"""
+
+        async with self._lock:
+            if self._loaded:
+                return
+            self.index = await asyncio.get_running_loop().run_in_executor(
+                None, self._load_index
+            )
+            self._loaded = True
+
+    def append(self, seq: int, log: Any) -> None:
+        if isinstance(log, (BaseModel, LogRecord)):
+            record = dict(log.dict(), seq=seq)
+        else:
+            record = {"message": str(log), "seq": seq}
+        record["ts"] = getattr(log, "created", None) or time.time()
+        self._pending.append(record)
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def flush(self) -> None:
+        async with self._lock:
+            batch, self._pending = self._pending, list()
+            if batch:
+                self.index = await asyncio.get_running_loop().run_in_executor(
+                    None, self._write_batch, self.index, batch
+                )
+
+    async def query(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        since_seq: Optional[int] = None,
+        limit: int = 0,
+    ) -> List[Dict[str, Any]]:
+        await self.flush()
+        async with self._lock:
+            # Files are only compressed or removed while holding the lock
+            segments = list(self.index.segments)
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self._read_range, segments, start_time, end_time, since_seq, limit
+            )
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        self._flush_task = None
+        await self.flush()
+
+    def _load_index(self) -> LogArchiveIndex:
+        try:
+            return LogArchiveIndex.parse_file(self.path / self.index_file_name)
+        except (OSError, ValueError):
+            return LogArchiveIndex(segments=list())
+
+    def _store_index(self, index: LogArchiveIndex) -> None:
+        index_file = self.path / self.index_file_name
+        temp_file = index_file.with_suffix(".tmp")
+        temp_file.write_text(index.json(), encoding="utf-8")
+        temp_file.replace(index_file)
+
+    def _write_batch(
+        self, index: LogArchiveIndex, batch: List[Dict[str, Any]]
+    ) -> LogArchiveIndex:
+        # Work on copies, readers in the event loop keep using the old index
+        segments = list(index.segments)
+        if not segments or segments[-1].compressed:
+            first = batch[0]
+            segments.append(
+                LogArchiveSegment(
+                    name=f"{first['seq']}.log",
+                    first_seq=first["seq"],
+                    last_seq=first["seq"],
+                    first_time=first["ts"],
+                    last_time=first["ts"],
+                )
+            )
+        else:
+            segments[-1] = segments[-1].copy(deep=True)
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        segment = segments[-1]
+        segment_file = self.path / segment.name
+        with open(segment_file, "ab") as f:
+            for record in batch:
+                if segment.count % self.checkpoint_interval == 0:
+                    segment.checkpoints.append(
+                        LogArchiveCheckpoint(
+                            seq=record["seq"], time=record["ts"], offset=f.tell()
+                        )
+                    )
+                line = json.dumps(record, ensure_ascii=False) + "\n"
+                f.write(line.encode("utf-8"))
+                segment.count += 1
+            segment.size = f.tell()
+
+        segment.last_seq = batch[-1]["seq"]
+        segment.last_time = batch[-1]["ts"]
+
+        if segment.size >= self.segment_size:
+            self._compress_segment(segment)
+
+        deadline = time.time() - self.retention_time
+        while len(segments) > 1 and segments[0].last_time < deadline:
+            expired = segments.pop(0)
+            (self.path / expired.name).unlink(missing_ok=True)
+
+        index = LogArchiveIndex(segments=segments)
+        self._store_index(index)
+        return index
+
+    def _compress_segment(self, segment: LogArchiveSegment) -> None:
+        raw_file = self.path / segment.name
+        # Segments written before checkpoints existed may not start with one
+        starts = [0] + [c.offset for c in segment.checkpoints if c.offset]
+        ends: List[Optional[int]] = list(starts[1:])
+        ends.append(None)
+
+        offsets: Dict[int, int] = dict()
+        with open(raw_file, "rb") as r, open(f"{raw_file}.gz", "wb") as w:
+            for start, end in zip(starts, ends):
+                r.seek(start)
+                data = r.read() if end is None else r.read(end - start)
+                offsets[start] = w.tell()
+                # One gzip member per checkpoint, so reads can start at any of them
+                w.write(gzip.compress(data))
+        raw_file.unlink()
+
+        for checkpoint in segment.checkpoints:
+            checkpoint.offset = offsets[checkpoint.offset]
+        segment.name = f"{segment.name}.gz"
+        segment.compressed = True
+
+    def _read_range(
+        self,
+        segments: List[LogArchiveSegment],
+        start_time: Optional[float],
+        end_time: Optional[float],
+        since_seq: Optional[int],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        begin = 0
+        if since_seq is not None:
+            seqs = [segment.first_seq for segment in segments]
+            begin = max(begin, bisect_right(seqs, since_seq + 1) - 1)
+        if start_time is not None:
+            times = [segment.first_time for segment in segments]
+            begin = max(begin, bisect_right(times, start_time) - 1)
+
+        result: List[Dict[str, Any]] = list()
+        for segment in segments[begin:]:
+            if end_time is not None and segment.first_time > end_time:
+                break
+            if start_time is not None and segment.last_time < start_time:
+                continue
+
+            offset = self._find_offset(segment, start_time, since_seq)
+            for record in self._read_segment(self.path / segment.name, offset):
+                if since_seq is not None and record["seq"] <= since_seq:
+                    continue
+                if start_time is not None and record["ts"] < start_time:
+                    continue
+                if end_time is not None and record["ts"] > end_time:
+                    break
+
+                result.append(record)
+                if limit and len(result) >= limit:
+                    return result
+
+        return result
+
+    @staticmethod
+    def _find_offset(
+        segment: LogArchiveSegment,
+        start_time: Optional[float],
+        since_seq: Optional[int],
+    ) -> int:
+        """查找范围起点之前最近的检查点的偏移"""
+
+        checkpoints = segment.checkpoints
+        position = -1
+        if since_seq is not None:
+            seqs = [checkpoint.seq for checkpoint in checkpoints]
+            position = max(position, bisect_right(seqs, since_seq + 1) - 1)
+        if start_time is not None:
+            times = [checkpoint.time for checkpoint in checkpoints]
+            position = max(position, bisect_left(times, start_time) - 1)
+        return checkpoints[position].offset if position >= 0 else 0
+
+    @staticmethod
+    def _read_segment(segment_file: Path, offset: int) -> Iterator[Dict[str, Any]]:
+        try:
+            with open(segment_file, "rb") as f:
+                f.seek(offset)
+                lines = gzip.GzipFile(fileobj=f) if segment_file.suffix == ".gz" else f
+                for line in lines:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except (OSError, EOFError):
+            return
+
+
+class LogArchiveManager:
+    archives: Dict[str, LogArchive] = dict()
+
+    @classmethod
+    async def get_archive(cls, key: str) -> LogArchive:
+        archive = cls.archives.get(key)
+        if archive is None:
+            archive = cls.archives[key] = LogArchive(key)
+        await archive.load()
+        return archive
+
+    @staticmethod
+    def is_valid_key(key: str) -> bool:
+        return bool(key) and ".." not in key and not any(c in key for c in "/\\:")
+
+    @classmethod
+    async def find_archive(cls, key: str) -> Optional[LogArchive]:
+        """查找已存在的归档，不会为未知的键创建目录"""
+
+        if not cls.is_valid_key(key):
+            return None
+
+        if key not in cls.archives:
+            path = get_data_dir() / "logs" / key
+            loop = asyncio.get_running_loop()
+            if not await loop.run_in_executor(None, path.is_dir):
+                return None
+        return await cls.get_archive(key)
+
+    @classmethod
+    async def flush_all(cls) -> None:
+        for archive in cls.archives.values():
+            await archive.flush()
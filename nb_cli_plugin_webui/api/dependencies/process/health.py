@@ -0,0 +1,194 @@
+import re
+import time
+import asyncio
+from typing import TYPE_CHECKING, Any, Optional
+
+import httpx
+
+from nb_cli_plugin_webui.models.schemas.process import ProcessHealthInfo
+from nb_cli_plugin_webui.api.dependencies.process.parse import strip_ansi
+from nb_cli_plugin_webui.models.domain.process import (
+    LogLevel,
+    LogRecord,
+    HealthProbeType,
+    HealthProbeConfig,
+)
+
+if TYPE_CHECKING:
+    from nb_cli_plugin_webui.api.dependencies.process.process import CustomProcessor
+
+READINESS_RETRY_INTERVAL: float = 1
+
+
+class ProcessHealthChecker:
+    """实例健康检查
+
+    就绪检测通过日志匹配、TCP 端口或 HTTP 请求判断实例是否已开始服务；
+    就绪后按间隔执行存活检测（日志模式仅检查进程是否存活），
+    连续失败达到阈值时终止进程，由守护进程按重启策略处理。
+    """
+
+    def __init__(self, processor: "CustomProcessor", config: HealthProbeConfig) -> None:
+        self.processor = processor
+        self.config = config
+
+        self.ready = False
+        self.healthy: Optional[bool] = None
+        self.ready_time: Optional[float] = None
+        self.last_check_time: Optional[float] = None
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+
+        self._ready_event = asyncio.Event()
+        self._pattern: Optional["re.Pattern[str]"] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.type != HealthProbeType.NONE
+
+    def prepare(self) -> None:
+        """在启动进程前编译日志匹配规则，规则无效时抛出 re.error"""
+
+        self._pattern = None
+        if self.config.type == HealthProbeType.LOG:
+            self._pattern = re.compile(self.config.log_pattern)
+
+    def start(self) -> None:
+        self.stop()
+        if not self.enabled:
+            return
+
+        self.prepare()
+        if self.config.type == HealthProbeType.LOG:
+            self.processor.logs.register_listener(self._match_log)
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._match_log in self.processor.logs.listeners:
+            self.processor.logs.unregister_listener(self._match_log)
+
+        self.ready = False
+        self.healthy = None
+        self.ready_time = None
+        self.consecutive_failures = 0
+        self._ready_event.clear()
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """等待实例就绪，未启用健康检查时直接返回 True"""
+
+        if not self.enabled or self.ready:
+            return True
+        try:
+            await asyncio.wait_for(self._ready_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def probe(self) -> None:
+        """执行一次探测，失败时抛出异常"""
+
+        config = self.config
+        if config.type == HealthProbeType.TCP:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(config.host, config.port), config.timeout
+            )
+            writer.close()
+            await writer.wait_closed()
+        elif config.type == HealthProbeType.HTTP:
+            url = f"http://{config.host}:{config.port}{config.http_path}"
+            async with httpx.AsyncClient(timeout=config.timeout) as client:
+                response = await client.get(url)
+            if response.status_code >= 500:
+                raise RuntimeError(f"HTTP {response.status_code}")
+        else:
+            process = self.processor.process
+            if process is None or process.returncode is not None:
+                raise RuntimeError("Process exited")
+
+    async def _match_log(self, log: Any) -> None:
+        if self.ready or self._pattern is None:
+            return
+        if self._pattern.search(strip_ansi(getattr(log, "message", str(log)))):
+            self._mark_ready()
+
+    def _mark_ready(self) -> None:
+        self.ready = True
+        self.healthy = True
+        self.ready_time = time.time()
+        self._ready_event.set()
+        # Only the first match matters, stop receiving every later line
+        if self._match_log in self.processor.logs.listeners:
+            self.processor.logs.unregister_listener(self._match_log)
+
+    async def _run(self) -> None:
+        config = self.config
+        if config.type == HealthProbeType.LOG:
+            ready = await self.wait_ready(config.startup_timeout)
+        else:
+            ready = await self._wait_probe_ready(config.startup_timeout)
+
+        if not ready:
+            await self._add_log(
+                f"Readiness probe not passed after {config.startup_timeout:.0f}s.",
+                LogLevel.WARNING,
+            )
+            if config.type == HealthProbeType.LOG:
+                await self.wait_ready()
+            else:
+                await self._wait_probe_ready(None)
+        await self._add_log("Readiness probe passed.", LogLevel.SUCCESS)
+
+        while True:
+            await asyncio.sleep(config.interval)
+            await self._check_liveness()
+
+    async def _wait_probe_ready(self, timeout: Optional[float]) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            try:
+                await self.probe()
+            except Exception as err:
+                self.last_error = repr(err)
+                await asyncio.sleep(READINESS_RETRY_INTERVAL)
+                continue
+
+            self._mark_ready()
+            return True
+        return False
+
+    async def _check_liveness(self) -> None:
+        self.last_check_time = time.time()
+        try:
+            await self.probe()
+        except Exception as err:
+            self.healthy = False
+            self.last_error = repr(err)
+            self.consecutive_failures += 1
+        else:
+            self.healthy = True
+            self.consecutive_failures = 0
+            return
+
+        if self.consecutive_failures >= self.config.failure_threshold:
+            self.processor.request_termination(
+                f"Liveness probe failed {self.consecutive_failures} times "
+                f"({self.last_error}), terminating."
+            )
+
+    async def _add_log(self, message: str, level: LogLevel) -> None:
+        await self.processor.logs.add_log(LogRecord(message, level=level))
+
+    def get_info(self) -> ProcessHealthInfo:
+        return ProcessHealthInfo(
+            probe=self.config.type,
+            ready=self.ready,
+            healthy=self.healthy,
+            ready_time=self.ready_time,
+            last_check_time=self.last_check_time,
+            consecutive_failures=self.consecutive_failures,
+            last_error=self.last_error,
+        )
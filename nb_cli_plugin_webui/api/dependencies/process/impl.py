@@ -7,7 +7,7 @@ from typing import IO, Any, Tuple, Union, Optional
 
 from nb_cli.consts import WINDOWS
 
-from nb_cli_plugin_webui.models.domain.process import ProcessLog
+from nb_cli_plugin_webui.models.domain.process import LogRecord
 from nb_cli_plugin_webui.api.dependencies.process.log import LoggerStorage
 
 
@@ -23,7 +23,7 @@ async def run_asyncio_subprocess_with_logging(
                 line = await stream.readline()
                 if line:
                     decode_line = line.decode("utf-8", "replace")
-                    log_model = ProcessLog(message=decode_line)
+                    log_model = LogRecord(decode_line)
                     await log_storage.add_log(log_model)
                 else:
                     break
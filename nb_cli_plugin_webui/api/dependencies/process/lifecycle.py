@@ -0,0 +1,352 @@
+import os
+import sys
+import asyncio
+from pathlib import Path
+from typing import Dict, List, Literal, Callable, Iterable, Optional, Awaitable
+
+from dotenv import dotenv_values
+from nb_cli.handlers.meta import get_default_python
+from nb_cli.config import SimpleInfo as CliSimpleInfo
+from nb_cli.handlers.project import generate_run_script
+
+from nb_cli_plugin_webui.core.log import logger as log
+from nb_cli_plugin_webui.core.configs.config import config
+from nb_cli_plugin_webui.api.dependencies.process.limits import MEBIBYTE
+from nb_cli_plugin_webui.models.schemas.project import NonebotProjectMeta
+from nb_cli_plugin_webui.api.dependencies.project import NonebotProjectManager
+from nb_cli_plugin_webui.api.dependencies.process.manager import ProcessManager
+from nb_cli_plugin_webui.api.dependencies.process.process import CustomProcessor
+from nb_cli_plugin_webui.api.dependencies.process.registry import ProcessRegistry
+from nb_cli_plugin_webui.api.dependencies.process.archive import LogArchiveManager
+from nb_cli_plugin_webui.api.dependencies.process.supervisor import ProcessSupervisor
+from nb_cli_plugin_webui.api.dependencies.process.log import (
+    LoggerStorage,
+    LoggerStorageFather,
+)
+from nb_cli_plugin_webui.models.domain.process import (
+    LogLevel,
+    CustomLog,
+    ProcessRecord,
+    HealthProbeConfig,
+    ProcessResourceLimits,
+)
+from nb_cli_plugin_webui.exceptions import (
+    ProcessIsNotExist,
+    ProcessAlreadyRunning,
+    NonebotProjectIsNotExist,
+    NonebotProjectModuleMissing,
+)
+
+DEFAULT_BULK_PARALLELISM: int = 8
+DEFAULT_DRIVER_PORT: int = 8080
+DETACHED_OUTPUT_FILE_NAME = "output.log"
+BulkAction = Literal["run", "stop", "restart"]
+BULK_RESULT_OK = "OK"
+BULK_RESULT_SKIPPED = "Skipped"
+
+
+def get_project_limits(project_detail: NonebotProjectMeta) -> ProcessResourceLimits:
+    return ProcessResourceLimits(
+        address_space=project_detail.limit_memory * MEBIBYTE,
+        rss=project_detail.limit_rss * MEBIBYTE,
+        cpu_time=project_detail.limit_cpu_time,
+        nofile=project_detail.limit_nofile,
+        nice=project_detail.nice,
+    )
+
+
+def get_project_health_probe(project_detail: NonebotProjectMeta) -> HealthProbeConfig:
+    port = project_detail.health_port
+    if not port:
+        # NoneBot reads `.env` first, then the file named by its ENVIRONMENT
+        project_dir = Path(project_detail.project_dir)
+        env_data = dotenv_values(project_dir / ".env")
+        environment = env_data.get("ENVIRONMENT")
+        if environment:
+            env_data.update(dotenv_values(project_dir / f".env.{environment}"))
+        try:
+            port = int(env_data.get("PORT") or DEFAULT_DRIVER_PORT)
+        except ValueError:
+            port = DEFAULT_DRIVER_PORT
+
+    return HealthProbeConfig(
+        type=project_detail.health_probe,
+        log_pattern=project_detail.health_log_pattern,
+        port=port,
+        http_path=project_detail.health_http_path,
+    )
+
+
+async def create_project_process(
+    project: NonebotProjectManager, project_detail: NonebotProjectMeta
+) -> CustomProcessor:
+    project_dir = Path(project_detail.project_dir)
+
+    env = os.environ.copy()
+    env["TERM"] = "xterm-color"
+    if sys.platform == "win32":
+        venv_path = project_dir / Path(".venv/Scripts")
+        env["PATH"] = f"{venv_path.absolute()};" + env["PATH"]
+    else:
+        venv_path = project_dir / Path(".venv/bin")
+        env["PATH"] = f"{venv_path.absolute()}:" + env["PATH"]
+
+    python_path = project.config_manager.python_path
+    if python_path is None:
+        python_path = await get_default_python()
+
+    raw_adapters = project_detail.adapters
+    new_adapters: List[CliSimpleInfo] = list()
+    for adapter in raw_adapters:
+        new_adapters.append(
+            CliSimpleInfo(name=adapter.name, module_name=adapter.module_name)
+        )
+    run_script = await generate_run_script(
+        adapters=new_adapters,
+        builtin_plugins=project_detail.builtin_plugins,
+    )
+
+    if project_detail.use_run_script:
+        run_script_file = project_dir / project_detail.run_script_name
+        if not run_script_file.is_file():
+            with open(run_script_file, "w", encoding="utf-8") as w:
+                w.write(run_script)
+        args = (python_path, run_script_file)
+    else:
+        args = (python_path, "-c", run_script)
+
+    archive = await LogArchiveManager.get_archive(project.project_id)
+    detach_on_exit = config.read().process.detach_on_exit
+    return CustomProcessor(
+        *args,
+        cwd=project_dir,
+        env=env,
+        log_rotation_time=5 * 60,
+        log_max_count=10000,
+        log_archive=archive,
+        supervisor=ProcessSupervisor(project_detail.restart_policy),
+        limits=get_project_limits(project_detail),
+        health_probe=get_project_health_probe(project_detail),
+        project_id=project.project_id,
+        new_session=detach_on_exit,
+        # A pipe would break once the WebUI exits, the bot writes to a file instead
+        output_file=archive.path / DETACHED_OUTPUT_FILE_NAME
+        if detach_on_exit
+        else None,
+    )
+
+
+async def run_project(project_id: str) -> CustomProcessor:
+    """启动实例进程，进程不存在时创建并注册
+
+    Raises:
+        NonebotProjectIsNotExist: 实例不存在
+        NonebotProjectModuleMissing: 实例未安装适配器或驱动器
+        ProcessAlreadyRunning: 实例正在运行中
+    """
+
+    project = NonebotProjectManager(project_id)
+    project_detail = project.read()
+
+    if not project_detail.adapters:
+        raise NonebotProjectModuleMissing("实例未安装任何适配器")
+    if not project_detail.drivers:
+        raise NonebotProjectModuleMissing("实例未安装任何驱动器")
+
+    process = ProcessManager.get_process(project_id)
+    if process:
+        if process.process_is_running:
+            raise ProcessAlreadyRunning
+
+        if process.supervisor:
+            process.supervisor.policy = project_detail.restart_policy
+        process.limits = get_project_limits(project_detail)
+        process.health.config = get_project_health_probe(project_detail)
+    else:
+        process = await create_project_process(project, project_detail)
+        LoggerStorageFather.add_storage(process.get_log_record(), project_id)
+        ProcessManager.add_process(process, project_id)
+
+    await process.start()
+    return process
+
+
+async def restore_project(key: str, record: ProcessRecord) -> None:
+    """恢复上次 WebUI 退出时仍在运行的实例，进程存活时直接接管，否则按配置重新启动"""
+
+    project_id = record.project_id
+    if ProcessManager.get_process(project_id):
+        return
+
+    project = NonebotProjectManager(project_id)
+    try:
+        project_detail = project.read()
+    except NonebotProjectIsNotExist:
+        ProcessRegistry.unregister(key)
+        return
+
+    alive = ProcessRegistry.find(key)
+    if alive is None:
+        if config.read().process.restore_on_start:
+            log.info(f"Restoring project {project_id=}.")
+            await run_project(project_id)
+        else:
+            ProcessRegistry.unregister(key)
+        return
+
+    process = await create_project_process(project, project_detail)
+    LoggerStorageFather.add_storage(process.get_log_record(), project_id)
+    ProcessManager.add_process(process, project_id)
+    await process.adopt(alive, record.output_offset)
+    log.info(f"Adopted project {project_id=} process pid={alive.pid}.")
+
+
+async def restore_projects(parallelism: int = DEFAULT_BULK_PARALLELISM) -> None:
+    semaphore = asyncio.Semaphore(max(parallelism, 1))
+
+    async def execute(key: str, record: ProcessRecord) -> None:
+        async with semaphore:
+            try:
+                await restore_project(key, record)
+            except Exception as err:
+                log.error(f"Restore project {record.project_id=} failed: {err!r}")
+
+    records = ProcessRegistry.get_records()
+    await asyncio.gather(
+        *(execute(key, record) for key, record in records.items() if record.project_id)
+    )
+
+
+async def stop_project(project_id: str) -> None:
+    process = ProcessManager.get_process(project_id)
+    if process is None:
+        raise ProcessIsNotExist
+
+    await process.stop()
+
+
+async def restart_project(project_id: str) -> None:
+    process = ProcessManager.get_process(project_id)
+    if process and process.process_is_running:
+        await process.stop()
+
+    await run_project(project_id)
+
+
+BULK_ACTIONS: Dict[str, Callable[[str], Awaitable[object]]] = {
+    "run": run_project,
+    "stop": stop_project,
+    "restart": restart_project,
+}
+
+
+async def run_bulk_action(
+    action: BulkAction,
+    project_ids: Iterable[str],
+    parallelism: int = DEFAULT_BULK_PARALLELISM,
+    log_storage: Optional[LoggerStorage] = None,
+) -> Dict[str, str]:
+    """并发地对多个实例执行启动、停止或重启，同时执行的数量不超过 `parallelism`
+
+    Args:
+        - action (BulkAction): 执行的操作
+        - project_ids (Iterable[str]): 实例 ID
+        - parallelism (int): 最大并发数
+        - log_storage (Optional[LoggerStorage]): 写入每个实例执行进度的日志存储
+
+    Returns:
+        Dict[str, str]: 每个实例的执行结果，成功时为 `OK`，
+            停止未运行或启动已运行的实例时为 `Skipped`，失败时为错误信息
+    """
+
+    func = BULK_ACTIONS[action]
+    semaphore = asyncio.Semaphore(max(parallelism, 1))
+    results: Dict[str, str] = dict()
+
+    async def notice(level: LogLevel, message: str) -> None:
+        if log_storage is not None:
+            await log_storage.add_log(CustomLog(level=level, message=message))
+
+    async def skip(project_id: str, reason: str) -> None:
+        results[project_id] = BULK_RESULT_SKIPPED
+        await notice(LogLevel.INFO, f"[{project_id}] Skipped, {reason}.")
+
+    async def execute(project_id: str) -> None:
+        async with semaphore:
+            process = ProcessManager.get_process(project_id)
+            running = bool(process and process.process_is_running)
+            if action == "stop" and not running:
+                await skip(project_id, "not running")
+                return
+            if action == "run" and running:
+                await skip(project_id, "already running")
+                return
+
+            await notice(LogLevel.INFO, f"[{project_id}] {action}...")
+            try:
+                await func(project_id)
+            except ProcessIsNotExist:
+                await skip(project_id, "not running")
+                return
+            except ProcessAlreadyRunning:
+                await skip(project_id, "already running")
+                return
+            except Exception as err:
+                results[project_id] = repr(err)
+                log.error(f"Bulk {action} {project_id=} failed: {err!r}")
+                await notice(LogLevel.ERROR, f"[{project_id}] ❗ Failed: {err!r}")
+                return
+
+            process = ProcessManager.get_process(project_id)
+            if action != "stop" and process and process.health.enabled:
+                # Hold the slot until the bot serves, so restarts roll
+                await notice(LogLevel.INFO, f"[{project_id}] waiting for ready...")
+                if not await process.health.wait_ready(
+                    process.health.config.startup_timeout
+                ):
+                    results[project_id] = "Not ready"
+                    await notice(LogLevel.WARNING, f"[{project_id}] ❗ Not ready")
+                    return
+
+            results[project_id] = BULK_RESULT_OK
+            await notice(LogLevel.SUCCESS, f"[{project_id}] ✨ Done!")
+
+    await asyncio.gather(*(execute(project_id) for project_id in project_ids))
+
+    succeeded = sum(result == BULK_RESULT_OK for result in results.values())
+    skipped = sum(result == BULK_RESULT_SKIPPED for result in results.values())
+    failed = len(results) - succeeded - skipped
+    await notice(
+        LogLevel.ERROR if failed else LogLevel.SUCCESS,
+        f"✨ Finished, {succeeded} succeeded, {skipped} skipped, {failed} failed.",
+    )
+    return results
+
+
+async def stop_all_projects(parallelism: int = DEFAULT_BULK_PARALLELISM) -> None:
+    """停止所有实例，保留进程登记以便下次启动 WebUI 时恢复"""
+
+    semaphore = asyncio.Semaphore(max(parallelism, 1))
+
+    async def execute(process: CustomProcessor) -> None:
+        async with semaphore:
+            try:
+                await process.stop(forget=False)
+            except Exception as err:
+                log.error(f"Stop process in {process.cwd} failed: {err!r}")
+
+    await asyncio.gather(
+        *(
+            execute(process)
+            for process in ProcessManager.processes.values()
+            if process.process_is_running
+        )
+    )
+
+
+async def detach_all_projects() -> None:
+    """保留所有实例运行，记录输出文件的读取位置以便下次启动 WebUI 时接管"""
+
+    for process in ProcessManager.processes.values():
+        if process.process_is_running:
+            await process.detach()
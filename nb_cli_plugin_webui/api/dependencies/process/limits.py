@@ -0,0 +1,62 @@
+import sys
+from typing import List
+
+import psutil
+
+from nb_cli_plugin_webui.models.domain.process import ProcessResourceLimits
+
+LINUX = sys.platform.startswith("linux")
+MEBIBYTE = 1024 * 1024
+
+if LINUX:
+    import resource
+
+
+def format_limits(limits: ProcessResourceLimits) -> str:
+    items: List[str] = list()
+    if limits.address_space:
+        items.append(f"address_space={limits.address_space // MEBIBYTE}MiB")
+    if limits.rss:
+        items.append(f"rss={limits.rss // MEBIBYTE}MiB")
+    if limits.cpu_time:
+        items.append(f"cpu_time={limits.cpu_time}s")
+    if limits.nofile:
+        items.append(f"nofile={limits.nofile}")
+    if limits.nice:
+        items.append(f"nice={limits.nice}")
+    return ", ".join(items)
+
+
+def apply_limits(pid: int, limits: ProcessResourceLimits) -> None:
+    """在父进程中为已启动的子进程设置限制，仅在 Linux 下可用
+
+    服务运行时线程池中始终有线程，`preexec_fn` 在 fork 后的子进程中可能死锁，
+    因此改为启动后通过 prlimit 设置，子进程启动后的极短时间内尚未受限。
+
+    Args:
+        - pid (int): 子进程 PID
+        - limits (ProcessResourceLimits): 资源限制
+    """
+
+    if not LINUX:
+        return
+
+    rlimits = list()
+    if limits.address_space:
+        rlimits.append((resource.RLIMIT_AS, limits.address_space))
+    if limits.cpu_time:
+        rlimits.append((resource.RLIMIT_CPU, limits.cpu_time))
+    if limits.nofile:
+        rlimits.append((resource.RLIMIT_NOFILE, limits.nofile))
+    if not rlimits and not limits.nice:
+        return
+
+    process = psutil.Process(pid)
+    for key, value in rlimits:
+        _, hard = process.rlimit(key)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        process.rlimit(key, (value, hard))
+    if limits.nice:
+        # Relative to the inherited niceness, the same as os.nice in the child
+        process.nice(min(process.nice() + limits.nice, 19))
@@ -1,48 +1,313 @@
+import time
 import asyncio
-from typing import Set, Dict, List, Generic, TypeVar, Callable, Awaitable
+from collections import deque
+from typing import (
+    Set,
+    Dict,
+    List,
+    Deque,
+    Tuple,
+    Generic,
+    TypeVar,
+    Callable,
+    Optional,
+    Awaitable,
+)
 
 from pydantic import BaseModel
 
 from nb_cli_plugin_webui.exceptions import LoggerStorageAlreadyExist
+from nb_cli_plugin_webui.models.domain.process import CustomLog, LogRecord
+from nb_cli_plugin_webui.api.dependencies.process.archive import LogArchive
+from nb_cli_plugin_webui.api.dependencies.process.search import LogSearchIndex, tokenize
 
 _T = TypeVar("_T")
 LogListener = Callable[[_T], Awaitable[None]]
 DEFAULT_ROTATION_TIME: float = 5 * 60
+DEFAULT_MAX_COUNT: int = 0
+COMPACT_THRESHOLD: int = 1024
+DEFAULT_QUEUE_SIZE: int = 2000
+DEFAULT_FLUSH_LINES: int = 200
+DEFAULT_FLUSH_INTERVAL: float = 0.1
+DEFAULT_SEARCH_LIMIT: int = 100
+
+
+class LogSubscriber(Generic[_T]):
+    """订阅者的有界日志队列，队列满时丢弃最旧的日志并记录丢弃数量"""
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_QUEUE_SIZE,
+        flush_lines: int = DEFAULT_FLUSH_LINES,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        self.max_size = max_size
+        self.flush_lines = flush_lines
+        self.flush_interval = flush_interval
+        self.dropped: int = 0
+
+        self._queue: Deque[_T] = deque()
+        self._ready = asyncio.Event()
+        self._full = asyncio.Event()
+
+    def push(self, log: _T) -> None:
+        if len(self._queue) >= self.max_size:
+            self._queue.popleft()
+            self.dropped += 1
+
+        self._queue.append(log)
+        self._ready.set()
+        if len(self._queue) >= self.flush_lines:
+            self._full.set()
+
+    def extend(self, logs: List[_T]) -> None:
+        overflow = len(self._queue) + len(logs) - self.max_size
+        if overflow > 0:
+            self.dropped += overflow
+            if len(logs) >= self.max_size:
+                start = len(logs) - self.max_size
+                self._queue.clear()
+                logs = logs[start:]
+            else:
+                for _ in range(overflow):
+                    self._queue.popleft()
+
+        self._queue.extend(logs)
+        self._ready.set()
+        if len(self._queue) >= self.flush_lines:
+            self._full.set()
+
+    async def get_batch(self) -> Tuple[int, List[_T]]:
+        """等待下一批日志，在攒满 `flush_lines` 条或超过 `flush_interval` 秒后返回
+
+        Returns:
+            Tuple[int, List[_T]]: 上次取出后被丢弃的日志数量及本批日志
+        """
+
+        while not self._queue:
+            self._ready.clear()
+            await self._ready.wait()
+
+        if len(self._queue) < self.flush_lines:
+            self._full.clear()
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+        logs = list(self._queue)
+        self._queue.clear()
+        dropped, self.dropped = self.dropped, 0
+        return dropped, logs
 
 
 class LoggerStorage(Generic[_T]):
-    def __init__(self, rotation_time: float = DEFAULT_ROTATION_TIME) -> None:
+    """环形日志存储，按数量及存活时间淘汰旧日志，值为 0 时不做对应限制"""
+
+    def __init__(
+        self,
+        rotation_time: float = DEFAULT_ROTATION_TIME,
+        max_count: int = DEFAULT_MAX_COUNT,
+        archive: Optional[LogArchive] = None,
+        searchable: bool = False,
+    ) -> None:
         self.rotation_time = rotation_time
-        self.logs: Dict[int, _T] = dict()
+        self.max_count = max_count
+        self.archive = archive
+        self.index = LogSearchIndex() if searchable else None
         self.listeners: Set[LogListener[_T]] = set()
+        self.subscribers: Set[LogSubscriber[_T]] = set()
+        # Total number of logs ever added, unaffected by eviction
+        self.total_count: int = 0
+
+        self._logs: List[_T] = list()
+        self._stamps: List[float] = list()
+        self._head: int = 0
+        self._first_seq: int = archive.last_seq + 1 if archive else 1
+
+    @property
+    def first_seq(self) -> int:
+        return self._first_seq
+
+    @property
+    def last_seq(self) -> int:
+        return self._first_seq + len(self._logs) - self._head - 1
 
     async def add_log(self, log: _T) -> int:
-        log_seq = len(self.logs) + 1
-        self.logs[log_seq] = log
+        now = time.monotonic()
+        self._logs.append(log)
+        self._stamps.append(now)
+        self._evict(now)
+        self.total_count += 1
+
+        log_seq = self.last_seq
+        self._set_seq(log, log_seq)
+        if self.index:
+            self.index.add(log_seq, getattr(log, "message", str(log)))
+        if self.archive:
+            self.archive.append(log_seq, log)
+
         await self._notify_listeners(log)
-        asyncio.get_running_loop().call_later(
-            self.rotation_time, self.remove_log, log_seq
-        )
         return log_seq
 
+    async def add_logs(self, logs: List[_T]) -> int:
+        if not logs:
+            return self.last_seq
+
+        now = time.monotonic()
+        first_seq = self.last_seq + 1
+        self._logs.extend(logs)
+        self._stamps.extend([now] * len(logs))
+        self._evict(now)
+        self.total_count += len(logs)
+
+        for log_seq, log in enumerate(logs, first_seq):
+            self._set_seq(log, log_seq)
+            if self.index and log_seq >= self._first_seq:
+                self.index.add(log_seq, getattr(log, "message", str(log)))
+            if self.archive:
+                self.archive.append(log_seq, log)
+
+        for subscriber in self.subscribers:
+            subscriber.extend(logs)
+        if self.listeners:
+            await self._notify_listeners_batch(logs)
+        return self.last_seq
+
     def get_logs(
         self, reverse: bool = False, limit: int = 0, is_dict: bool = False
     ) -> List[_T]:
-        if is_dict and isinstance(self.logs.get(0), BaseModel):
-            logs = [
-                # Stupid linter
-                self.logs[log_seq].dict()  # type: ignore
-                for log_seq in sorted(self.logs, reverse=reverse)
-            ]
+        self._evict()
+
+        start, stop = self._head, len(self._logs)
+        if limit and reverse:
+            stop = min(start + limit, stop)
+        elif limit:
+            start = max(start, stop - limit)
+
+        logs = self._logs[start:stop]
+        if reverse:
+            logs.reverse()
+
+        return self._dump(logs) if is_dict else logs
+
+    def get_logs_slice(
+        self,
+        since_seq: Optional[int] = None,
+        before_seq: Optional[int] = None,
+        limit: int = 0,
+        levels: Optional[List[str]] = None,
+        is_dict: bool = False,
+    ) -> Tuple[int, int, List[_T]]:
+        """按序号游标获取日志切片
+
+        Args:
+            - since_seq (Optional[int]): 仅返回序号大于该值的日志
+            - before_seq (Optional[int]): 仅返回序号小于该值的日志
+            - limit (int): 数量上限，仅指定 `since_seq` 时取最早的部分，否则取最新的部分
+            - levels (Optional[List[str]]): 仅返回指定等级的日志
+            - is_dict (bool): 是否转换为 dict
+
+        Returns:
+            Tuple[int, int, List[_T]]: 本次扫描范围的首尾序号及日志列表
+        """
+
+        self._evict()
+
+        offset = self._head - self._first_seq
+        start, stop = self._head, len(self._logs)
+        if since_seq is not None:
+            start = max(start, min(stop, since_seq + 1 + offset))
+        if before_seq is not None:
+            stop = min(stop, max(start, before_seq + offset))
+        forward = since_seq is not None and before_seq is None
+
+        if levels:
+            logs = list()
+            positions = (
+                range(start, stop) if forward else range(stop - 1, start - 1, -1)
+            )
+            for position in positions:
+                log = self._logs[position]
+                if getattr(log, "level", None) in levels:
+                    logs.append(log)
+                    if limit and len(logs) >= limit:
+                        break
+            else:
+                position = stop - 1 if forward else start
+
+            if forward:
+                stop = position + 1
+            else:
+                start = position
+                logs.reverse()
         else:
-            logs = [
-                self.logs[log_seq] for log_seq in sorted(self.logs, reverse=reverse)
-            ]
+            if limit and forward:
+                stop = min(stop, start + limit)
+            elif limit:
+                start = max(start, stop - limit)
+            logs = self._logs[start:stop]
+
+        return (
+            start - offset,
+            stop - 1 - offset,
+            self._dump(logs) if is_dict else logs,
+        )
+
+    def search(
+        self,
+        query: str,
+        levels: Optional[List[str]] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+    ) -> List[Tuple[int, _T]]:
+        """在当前保留的日志中检索包含全部查询词项的日志，按从新到旧排列
+
+        Args:
+            - query (str): 查询内容
+            - levels (Optional[List[str]]): 仅返回指定等级的日志
+            - start_time (Optional[float]): 起始时间戳
+            - end_time (Optional[float]): 结束时间戳
+            - limit (int): 数量上限
+
+        Returns:
+            List[Tuple[int, _T]]: 日志序号及日志
+        """
+
+        if self.index is None:
+            return list()
+
+        self._evict()
+        terms, candidates = self.index.candidates(query)
+        offset = self._head - self._first_seq
+        clock_offset = time.time() - time.monotonic()
+
+        result: List[Tuple[int, _T]] = list()
+        for seq in candidates:
+            stamp = self._stamps[seq + offset] + clock_offset
+            if end_time is not None and stamp > end_time:
+                continue
+            if start_time is not None and stamp < start_time:
+                break
+
+            log = self._logs[seq + offset]
+            if levels and getattr(log, "level", None) not in levels:
+                continue
+            if len(terms) > 1:
+                tokens = tokenize(getattr(log, "message", str(log)))
+                if not tokens.issuperset(terms):
+                    continue
 
-        return logs[-limit:] if limit else logs
+            result.append((seq, log))
+            if limit and len(result) >= limit:
+                break
+
+        return result
 
     def get_count(self) -> int:
-        return len(self.logs)
+        self._evict()
+        return len(self._logs) - self._head
 
     def register_listener(self, listener: LogListener[_T]) -> None:
         self.listeners.add(listener)
@@ -50,17 +315,73 @@ class LoggerStorage(Generic[_T]):
     def unregister_listener(self, listener: LogListener[_T]) -> None:
         self.listeners.remove(listener)
 
-    async def _notify_listeners(self, log: _T) -> None:
-        await asyncio.gather(
-            *[listener(log) for listener in self.listeners], return_exceptions=True
-        )
+    def subscribe(self, **kwargs) -> LogSubscriber[_T]:
+        subscriber = LogSubscriber[_T](**kwargs)
+        self.subscribers.add(subscriber)
+        return subscriber
 
-    def remove_log(self, seq: int) -> None:
-        try:
-            self.logs.pop(seq)
-        except KeyError:
-            pass
-        return
+    def unsubscribe(self, subscriber: LogSubscriber[_T]) -> None:
+        self.subscribers.discard(subscriber)
+
+    async def _notify_listeners(self, log: _T, to_subscribers: bool = True) -> None:
+        if to_subscribers:
+            for subscriber in self.subscribers:
+                subscriber.push(log)
+
+        if self.listeners:
+            await asyncio.gather(
+                *[listener(log) for listener in self.listeners],
+                return_exceptions=True,
+            )
+
+    async def _notify_listeners_batch(self, logs: List[_T]) -> None:
+        async def notify(listener: LogListener[_T]) -> None:
+            for log in logs:
+                try:
+                    await listener(log)
+                except Exception:
+                    continue
+
+        # One await per batch, each listener still receives the logs in order
+        await asyncio.gather(*[notify(listener) for listener in self.listeners])
+
+    @staticmethod
+    def _set_seq(log: _T, seq: int) -> None:
+        if isinstance(log, (LogRecord, CustomLog)):
+            log.seq = seq
+
+    @staticmethod
+    def _dump(logs: List[_T]) -> List[_T]:
+        # Stupid linter
+        return [
+            log.dict() if isinstance(log, (BaseModel, LogRecord)) else log  # type: ignore
+            for log in logs
+        ]
+
+    def _evict(self, now: Optional[float] = None) -> None:
+        head, end = self._head, len(self._logs)
+        if self.max_count:
+            head = max(head, end - self.max_count)
+
+        if self.rotation_time > 0:
+            deadline = (now or time.monotonic()) - self.rotation_time
+            stamps = self._stamps
+            while head < end and stamps[head] <= deadline:
+                head += 1
+
+        if head == self._head:
+            return
+
+        self._first_seq += head - self._head
+        self._head = head
+        if self.index:
+            self.index.evict(self._first_seq)
+
+        # Only compact once evicted slots dominate, keeps the sweep amortized O(1)
+        if head == end or (head >= COMPACT_THRESHOLD and head * 2 >= end):
+            del self._logs[:head]
+            del self._stamps[:head]
+            self._head = 0
 
 
 class LoggerStorageFather(Generic[_T]):
@@ -19,4 +19,6 @@ class ProcessManager:
     def remove_process(cls, key: str) -> None:
         process = cls.processes.pop(key)
         process.logs.listeners.clear()
+        process.logs.subscribers.clear()
+        process.status_sampler.subscribers.clear()
         return
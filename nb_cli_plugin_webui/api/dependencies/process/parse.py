@@ -0,0 +1,44 @@
+import re
+from typing import Any, Dict
+
+from nb_cli_plugin_webui.models.domain.process import LogLevel
+
+ANSI_PATTERN = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+# NoneBot default loguru format: "{time:MM-DD HH:mm:ss} [{level}] {name} | {message}"
+NONEBOT_LOG_PATTERN = re.compile(
+    r"(?:\d{2}-\d{2} )?(?P<time>\d{2}:\d{2}:\d{2}) "
+    r"\[(?P<level>[A-Z]+)\] (?P<module>\S+) \| "
+)
+LOG_LEVELS = {level.value: level for level in LogLevel}
+
+
+def strip_ansi(text: str) -> str:
+    return ANSI_PATTERN.sub(str(), text) if "\x1b" in text else text
+
+
+class LogLineParser:
+    """解析 NoneBot 输出的日志等级、时间及来源模块
+
+    未匹配格式的行（如异常堆栈）沿用上一条结构化日志的等级及模块。
+    """
+
+    def __init__(self) -> None:
+        self.level = LogLevel.STDOUT
+        self.module = str()
+
+    def parse(self, line: str) -> Dict[str, Any]:
+        match = NONEBOT_LOG_PATTERN.match(strip_ansi(line))
+        if match is None:
+            return {"level": self.level, "module": self.module}
+
+        self.level = LOG_LEVELS.get(match.group("level"), LogLevel.STDOUT)
+        self.module = match.group("module")
+        return {
+            "time": match.group("time"),
+            "level": self.level,
+            "module": self.module,
+        }
+
+    def reset(self) -> None:
+        self.level = LogLevel.STDOUT
+        self.module = str()
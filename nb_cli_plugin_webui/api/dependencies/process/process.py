@@ -1,25 +1,58 @@
 import os
+import signal
 import asyncio
 import threading
 import subprocess
 from pathlib import Path
-from typing import Dict, Union, Optional, AsyncIterator
+from asyncio.streams import StreamReader
+from typing import Dict, Union, BinaryIO, Callable, Optional, Awaitable, AsyncIterator
 
 import psutil
 from nb_cli.consts import WINDOWS
-from nb_cli.handlers.process import terminate_process
 
-from nb_cli_plugin_webui.utils import decode_parse
 from nb_cli_plugin_webui.core.log import logger as log
 from nb_cli_plugin_webui.exceptions import ProcessAlreadyRunning
-from nb_cli_plugin_webui.models.domain.process import ProcessLog
-from nb_cli_plugin_webui.models.schemas.process import ProcessInfo, ProcessPerformance
+from nb_cli_plugin_webui.utils import StreamDecoder, decode_parse
+from nb_cli_plugin_webui.models.schemas.process import ProcessInfo
+from nb_cli_plugin_webui.api.dependencies.process.stdin import StdinWriter
+from nb_cli_plugin_webui.api.dependencies.process.archive import LogArchive
+from nb_cli_plugin_webui.api.dependencies.process.parse import LogLineParser
+from nb_cli_plugin_webui.api.dependencies.process.health import ProcessHealthChecker
+from nb_cli_plugin_webui.api.dependencies.process.sampler import ProcessStatusSampler
+from nb_cli_plugin_webui.api.dependencies.process.supervisor import ProcessSupervisor
 from nb_cli_plugin_webui.api.dependencies.process.log import (
     LoggerStorage as BaseLoggerStorage,
 )
+from nb_cli_plugin_webui.api.dependencies.process.registry import (
+    AdoptedProcess,
+    ProcessRegistry,
+)
+from nb_cli_plugin_webui.api.dependencies.process.log import (
+    DEFAULT_MAX_COUNT,
+    DEFAULT_ROTATION_TIME,
+)
+from nb_cli_plugin_webui.api.dependencies.process.tree import (
+    terminate_processes,
+    terminate_process_tree,
+)
+from nb_cli_plugin_webui.api.dependencies.process.limits import (
+    LINUX,
+    MEBIBYTE,
+    apply_limits,
+    format_limits,
+)
+from nb_cli_plugin_webui.models.domain.process import (
+    LogLevel,
+    LogRecord,
+    HealthProbeConfig,
+    ProcessResourceLimits,
+)
+
+OUTPUT_CHUNK_SIZE = 64 * 1024
+OUTPUT_POLL_INTERVAL: float = 0.2
 
 
-class LoggerStorage(BaseLoggerStorage[ProcessLog]):
+class LoggerStorage(BaseLoggerStorage[LogRecord]):
     pass
 
 
@@ -33,45 +66,91 @@ class CustomProcessor:
         *args: Union[str, bytes, "os.PathLike[str]", "os.PathLike[bytes]"],
         cwd: Path,
         env: Optional[Dict[str, str]] = None,
-        log_rotation_time: float = float(),
+        log_rotation_time: float = DEFAULT_ROTATION_TIME,
+        log_max_count: int = DEFAULT_MAX_COUNT,
+        log_archive: Optional[LogArchive] = None,
+        chunked_output: bool = True,
+        supervisor: Optional[ProcessSupervisor] = None,
+        limits: Optional[ProcessResourceLimits] = None,
+        health_probe: Optional[HealthProbeConfig] = None,
+        project_id: str = str(),
+        new_session: bool = False,
+        output_file: Optional[Path] = None,
     ) -> None:
         self.args = args
         self.cwd = cwd
         self.env = env
+        self.chunked_output = chunked_output
+        self.supervisor = supervisor
+        self.limits = limits or ProcessResourceLimits()
+        self.project_id = project_id
+        self.new_session = new_session
+        # Output goes to this file instead of a pipe, so the bot can outlive the WebUI
+        self.output_file = output_file
+        self.output_offset = 0
+        self.registry_key = str(cwd.absolute())
         self.process_event = asyncio.Event()
-        self.logs = LoggerStorage(log_rotation_time)
+        self.logs = LoggerStorage(
+            log_rotation_time, log_max_count, log_archive, searchable=True
+        )
+
+        self.log_parser = LogLineParser()
+        self.status_sampler = ProcessStatusSampler(self)
+        self.stdin_writer = StdinWriter(self)
+        self.health = ProcessHealthChecker(self, health_probe or HealthProbeConfig())
 
         self.output_task = None
         self.error_task = None
+        self.terminate_task: Optional[asyncio.Task] = None
+        # Set while a requested stop is in progress, the exit is then not a crash
+        self.stopping = False
 
     async def _find_duplicate_process(self) -> AsyncIterator[int]:
-        for process in psutil.process_iter():
-            try:
-                with process.oneshot():
-                    pid = process.pid
-                    cwd = Path(process.cwd()).absolute()
-            except psutil.Error:
-                continue
-
-            if not (cwd.is_dir()):
-                continue
-            if self.cwd.absolute() == cwd:
-                process.terminate()
-                yield pid
+        process = ProcessRegistry.find(self.registry_key)
+        if process is None:
+            return
 
-        return
+        try:
+            process.terminate()
+        except psutil.Error:
+            return
+        yield process.pid
 
     async def _process_executer(self) -> Optional[int]:
-        self.process = await asyncio.create_subprocess_exec(
-            *self.args,
-            cwd=self.cwd,
-            env=self.env,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT,
-            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if WINDOWS else 0,
-        )
-        assert self.process.stdin and self.process.stdout
+        stdout: Union[int, BinaryIO] = asyncio.subprocess.PIPE
+        if self.output_file:
+            self.output_file.parent.mkdir(parents=True, exist_ok=True)
+            # Only the current run is kept, earlier output is in the archive
+            stdout = open(self.output_file, "wb")
+            self.output_offset = 0
+
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                *self.args,
+                cwd=self.cwd,
+                env=self.env,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=stdout,
+                stderr=asyncio.subprocess.STDOUT,
+                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if WINDOWS else 0,
+                start_new_session=self.new_session and not WINDOWS,
+            )
+        finally:
+            if not isinstance(stdout, int):
+                stdout.close()
+        assert self.process.stdin
+
+        limits_detail = format_limits(self.limits)
+        if limits_detail:
+            try:
+                apply_limits(self.process.pid, self.limits)
+            except psutil.Error as err:
+                log_model = LogRecord(
+                    f"Apply resource limits failed: {err}", level=LogLevel.WARNING
+                )
+            else:
+                log_model = LogRecord(f"Resource limits applied: {limits_detail}.")
+            await self.logs.add_log(log_model)
 
         async def read_output():
             async for output in self.process.stdout:  # type: ignore
@@ -79,39 +158,136 @@ class CustomProcessor:
                 if not output:
                     continue
 
-                log_model = ProcessLog(message=output)
+                log_model = LogRecord(output, **self.log_parser.parse(output))
                 await self.logs.add_log(log_model)
 
-        if self.process.stdout:
-            self.output_task = asyncio.create_task(read_output())
+        async def read_output_chunked():
+            stdout: StreamReader = self.process.stdout  # type: ignore
+            await self._read_chunks(stdout.read)
 
-        async def error_exit():
-            if self.process:
-                await self.process.wait()
-                await asyncio.sleep(5)
-                await self.stop()
+        if self.output_file:
+            self.output_task = asyncio.create_task(self._read_output_file())
+        elif self.process.stdout:
+            reader = read_output_chunked if self.chunked_output else read_output
+            self.output_task = asyncio.create_task(reader())
 
-        self.error_task = asyncio.create_task(error_exit())
+        self.error_task = asyncio.create_task(self._watch_exit())
 
-    def get_status(self):
-        if not self.process or self.process.returncode is not None:
-            return ProcessInfo(
-                status_code=self.process.returncode if self.process else None,
-                total_log=self.logs.get_count(),
-                is_running=self.process_is_running,
-                performance=None,
+    async def _read_chunks(self, read: Callable[[int], Awaitable[bytes]]) -> None:
+        decoder = StreamDecoder()
+        parse = self.log_parser.parse
+        pending = str()
+        while True:
+            chunk = await read(OUTPUT_CHUNK_SIZE)
+            lines = (pending + decoder.decode(chunk, final=not chunk)).split("\n")
+            pending = lines.pop()
+            if not chunk and pending:
+                lines.append(pending)
+            elif len(pending) > OUTPUT_CHUNK_SIZE:
+                lines.append(pending)
+                pending = str()
+
+            # CRLF output would otherwise keep a trailing "\r" in every message
+            lines = [line[:-1] if line.endswith("\r") else line for line in lines]
+            await self.logs.add_logs(
+                [LogRecord(line + "\n", **parse(line)) for line in lines if line]
             )
+            if not chunk:
+                break
+
+    async def _read_output_file(self) -> None:
+        """跟随读取输出文件，进程退出且读到文件末尾后结束"""
+
+        assert self.output_file
+        with open(self.output_file, "rb") as f:
+            f.seek(self.output_offset)
+
+            async def read(size: int) -> bytes:
+                while True:
+                    exited = not self.process or self.process.returncode is not None
+                    chunk = f.read(size)
+                    if chunk or exited:
+                        self.output_offset = f.tell()
+                        return chunk
+                    await asyncio.sleep(OUTPUT_POLL_INTERVAL)
+
+            await self._read_chunks(read)
 
-        with (ps := psutil.Process(self.process.pid)).oneshot():
-            cpu = ps.cpu_percent()
-            mem = ps.memory_percent()
+    async def _watch_exit(self) -> None:
+        if not self.process:
+            return
 
-        return ProcessInfo(
-            status_code=self.process.returncode,
-            total_log=self.logs.get_count(),
-            is_running=self.process_is_running,
-            performance=ProcessPerformance(cpu=cpu, mem=mem),
+        exit_code = await self.process.wait()
+        if self.stopping:
+            return
+
+        self.health.stop()
+        if LINUX and self.limits.cpu_time and exit_code == -signal.SIGXCPU:
+            log_model = LogRecord(
+                f"CPU time limit exceeded ({self.limits.cpu_time}s).",
+                level=LogLevel.ERROR,
+            )
+            await self.logs.add_log(log_model)
+        delay = self.supervisor.on_exit(exit_code) if self.supervisor else None
+        if delay is not None:
+            await self._restart(exit_code, delay)
+            return
+
+        if self.supervisor and self.supervisor.crash_loop:
+            log_model = LogRecord(
+                "Process is crash looping, restart disabled.",
+                level=LogLevel.ERROR,
+            )
+            await self.logs.add_log(log_model)
+        await asyncio.sleep(5)
+        await self.stop()
+
+    async def _restart(self, exit_code: int, delay: float) -> None:
+        if self.output_task:
+            # Drain the remaining output of the exited process first
+            await asyncio.wait({self.output_task}, timeout=5)
+        # The writer holds the stdin of the exited process
+        await self.stdin_writer.close()
+        # Keep the registry record, `_launch` replaces it with the new pid
+        await terminate_processes(self.status_sampler.get_children())
+        self.status_sampler.clear_children()
+
+        log_model = LogRecord(
+            f"Process exited with code {exit_code}, restarting in {delay:.1f}s.",
+            level=LogLevel.WARNING,
         )
+        await self.logs.add_log(log_model)
+        await asyncio.sleep(delay)
+
+        log.info(f"Restarting process in {self.cwd}.")
+        try:
+            await self._launch()
+        except Exception as err:
+            log.error(f"Restart process failed: {err}")
+            await self.stop()
+
+    def enforce_rss_limit(self, rss: int) -> None:
+        detail = f"{rss // MEBIBYTE}MiB > {self.limits.rss // MEBIBYTE}MiB"
+        self.request_termination(f"Memory limit exceeded ({detail}), terminating.")
+
+    def request_termination(self, reason: str) -> None:
+        """记录原因并终止进程树，进程退出后由守护进程按重启策略处理"""
+
+        if self.terminate_task and not self.terminate_task.done():
+            return
+        self.terminate_task = asyncio.create_task(self._terminate(reason))
+
+    async def _terminate(self, reason: str) -> None:
+        if not self.process or self.process.returncode is not None:
+            return
+
+        log.warning(f"Process in {self.cwd}: {reason}")
+        log_model = LogRecord(reason, level=LogLevel.ERROR)
+        await self.logs.add_log(log_model)
+        await terminate_process_tree(self.process, self.status_sampler.get_children())
+
+    def get_status(self) -> ProcessInfo:
+        return self.status_sampler.get_status()
 
     def get_log_record(self) -> LoggerStorage:
         return self.logs
@@ -120,26 +296,120 @@ class CustomProcessor:
         if self.process_is_running:
             raise ProcessAlreadyRunning
 
+        if self.supervisor:
+            self.supervisor.reset()
+        await self._launch()
+
+    async def _launch(self) -> None:
+        self.stopping = False
+        if self.supervisor:
+            self.supervisor.on_start()
+
+        # Fail before spawning, so a bad pattern never leaves a bot running
+        self.health.prepare()
+
         async for pid in self._find_duplicate_process():
             log.warning(f"Possible process {pid=} found, terminated.")
 
         self.process_is_running = True
-        await self._process_executer()
+        self.log_parser.reset()
+        try:
+            await self._process_executer()
+        except (OSError, subprocess.SubprocessError) as err:
+            self.process_is_running = False
+            log_model = LogRecord(
+                f"Failed to start process: {err}", level=LogLevel.ERROR
+            )
+            await self.logs.add_log(log_model)
+            raise
+        if self.process:
+            ProcessRegistry.register(
+                self.registry_key, self.process.pid, self.project_id
+            )
+        self.status_sampler.ensure_running()
+        self.health.start()
+
+    async def adopt(
+        self, process: psutil.Process, output_offset: Optional[int] = None
+    ) -> None:
+        """接管上次运行时启动且仍存活的进程
+
+        Args:
+            - process (psutil.Process): 接管的进程
+            - output_offset (Optional[int]): 输出文件中上次读取到的位置，为空时从文件末尾开始读取
+        """
+
+        if self.process_is_running:
+            raise ProcessAlreadyRunning
 
-    async def stop(self):
+        if self.supervisor:
+            self.supervisor.reset()
+            self.supervisor.on_start()
+
+        self.stopping = False
+        self.process = AdoptedProcess(process)  # type: ignore
+        self.process_is_running = True
+        self.output_task = None
+        if self.output_file and self.output_file.is_file():
+            size = self.output_file.stat().st_size
+            self.output_offset = size if output_offset is None else output_offset
+            self.output_task = asyncio.create_task(self._read_output_file())
+        self.error_task = asyncio.create_task(self._watch_exit())
+        self.status_sampler.ensure_running()
+        self.health.start()
+
+        if self.output_task:
+            message = f"Adopted running process pid={process.pid}."
+        else:
+            message = (
+                f"Adopted running process pid={process.pid}, "
+                "its output is no longer captured."
+            )
+        await self.logs.add_log(LogRecord(message))
+
+    async def detach(self) -> None:
+        """停止读取输出并保留进程运行，记录输出文件的读取位置以便下次启动时接管"""
+
+        self.stopping = True
+        for task in (self.error_task, self.output_task, self.terminate_task):
+            if task:
+                task.cancel()
+        self.health.stop()
+        await self.stdin_writer.close()
+        if self.output_file:
+            ProcessRegistry.set_output_offset(self.registry_key, self.output_offset)
+
+    async def stop(self, forget: bool = True):
+        """停止进程
+
+        Args:
+            - forget (bool): 是否从进程登记中移除，保留时下次启动 WebUI 可恢复该实例
+        """
+
+        self.stopping = True
         self.process_is_running = False
+        # Cancel before terminating, so the exit watcher never sees this exit
+        if self.error_task and self.error_task is not asyncio.current_task():
+            self.error_task.cancel()
+
+        self.health.stop()
+        await self.stdin_writer.close()
+        if self.supervisor:
+            self.supervisor.next_restart_time = None
         if self.process:
             pid = self.process.pid
-            await terminate_process(self.process)
+            await terminate_process_tree(
+                self.process, self.status_sampler.get_children()
+            )
+            self.status_sampler.clear_children()
+            if forget:
+                ProcessRegistry.unregister(self.registry_key)
             log.info(f"Process {pid=} terminated.")
 
         if self.output_task:
             self.output_task.cancel()
 
-        if self.error_task:
-            self.error_task.cancel()
-
-        log_model = ProcessLog(message="Process finished.")
+        log_model = LogRecord("Process finished.")
         await self.logs.add_log(log_model)
 
     async def write_stdin(self, data: bytes) -> int:
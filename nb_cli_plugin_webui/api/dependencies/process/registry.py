@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import psutil
+from pydantic import ValidationError
+
+from nb_cli_plugin_webui.utils.store import get_data_file
+from nb_cli_plugin_webui.models.domain.process import ProcessRecord, ProcessRegistryData
+
+CREATE_TIME_TOLERANCE: float = 0.01
+
+
+def get_cmdline_fingerprint(cmdline: List[str]) -> str:
+    return hashlib.sha1("\0".join(cmdline).encode()).hexdigest()
+
+
+class ProcessRegistry:
+    """记录由 WebUI 启动的进程，用于精确识别重复进程"""
+
+    registry_file_name = "webui-process-registry.json"
+
+    @classmethod
+    def get_registry_file(cls) -> Path:
+        # Resolved on use, importing the module must not create the data dir
+        return get_data_file(cls.registry_file_name)
+
+    @classmethod
+    def _load(cls) -> ProcessRegistryData:
+        try:
+            return ProcessRegistryData.parse_file(cls.get_registry_file())
+        except (OSError, ValueError, ValidationError):
+            return ProcessRegistryData(processes=dict())
+
+    @classmethod
+    def _store(cls, data: ProcessRegistryData) -> None:
+        cls.get_registry_file().write_text(data.json(), encoding="utf-8")
+
+    @classmethod
+    def register(cls, key: str, pid: int, project_id: str = str()) -> None:
+        try:
+            process = psutil.Process(pid)
+            with process.oneshot():
+                record = ProcessRecord(
+                    pid=pid,
+                    create_time=process.create_time(),
+                    fingerprint=get_cmdline_fingerprint(process.cmdline()),
+                    project_id=project_id,
+                )
+        except psutil.Error:
+            return
+
+        data = cls._load()
+        data.processes[key] = record
+        cls._store(data)
+
+    @classmethod
+    def set_output_offset(cls, key: str, offset: int) -> None:
+        data = cls._load()
+        record = data.processes.get(key)
+        if record is not None:
+            record.output_offset = offset
+            cls._store(data)
+
+    @classmethod
+    def get_records(cls) -> Dict[str, ProcessRecord]:
+        return cls._load().processes
+
+    @classmethod
+    def unregister(cls, key: str) -> None:
+        data = cls._load()
+        if data.processes.pop(key, None) is not None:
+            cls._store(data)
+
+    @classmethod
+    def find(cls, key: str) -> Optional[psutil.Process]:
+        """查找登记的进程，仅当 PID、创建时间及命令行均一致时返回"""
+
+        record = cls._load().processes.get(key)
+        if record is None:
+            return None
+
+        try:
+            process = psutil.Process(record.pid)
+            with process.oneshot():
+                create_time = process.create_time()
+                fingerprint = get_cmdline_fingerprint(process.cmdline())
+        except psutil.Error:
+            return None
+
+        if abs(create_time - record.create_time) > CREATE_TIME_TOLERANCE:
+            return None
+        if fingerprint != record.fingerprint:
+            return None
+        return process
+
+
+class AdoptedProcess:
+    """重新接管的进程，提供 `CustomProcessor` 所需的 `asyncio.subprocess.Process` 接口
+
+    接管的进程不是当前进程的子进程，无法读取其输出及退出码，
+    退出后 `returncode` 记为 1，视作异常退出。
+    """
+
+    stdin = None
+    stdout = None
+
+    def __init__(self, process: psutil.Process, poll_interval: float = 1) -> None:
+        self.pid = process.pid
+        self.returncode: Optional[int] = None
+        self.poll_interval = poll_interval
+        self._process = process
+
+    def _is_alive(self) -> bool:
+        try:
+            # is_running() also detects a reused pid
+            return (
+                self._process.is_running()
+                and self._process.status() != psutil.STATUS_ZOMBIE
+            )
+        except psutil.Error:
+            return False
+
+    async def wait(self) -> int:
+        while self.returncode is None:
+            if not self._is_alive():
+                self.returncode = 1
+                break
+            await asyncio.sleep(self.poll_interval)
+        return self.returncode
+
+    def send_signal(self, sig: int) -> None:
+        try:
+            self._process.send_signal(sig)
+        except psutil.NoSuchProcess:
+            pass
+
+    def terminate(self) -> None:
+        try:
+            self._process.terminate()
+        except psutil.NoSuchProcess:
+            pass
+
+    def kill(self) -> None:
+        try:
+            self._process.kill()
+        except psutil.NoSuchProcess:
+            pass
@@ -0,0 +1,198 @@
+import time
+import asyncio
+from typing import TYPE_CHECKING, Set, Dict, List, Optional
+
+import psutil
+from nb_cli.consts import WINDOWS
+
+from nb_cli_plugin_webui.utils.timeseries import TieredTimeSeries
+from nb_cli_plugin_webui.models.schemas.process import ProcessInfo, ProcessPerformance
+
+if TYPE_CHECKING:
+    from nb_cli_plugin_webui.api.dependencies.process.process import CustomProcessor
+
+DEFAULT_SAMPLE_INTERVAL: float = 1
+RESOURCE_FIELDS = (
+    "rss",
+    "cpu_time",
+    "threads",
+    "fds",
+    "io_read",
+    "io_write",
+    "processes",
+)
+
+
+class ProcessStatusSampler:
+    """进程状态采样器
+
+    持有主进程及其子孙进程的 `psutil.Process` 句柄，使 `cpu_percent` 能按两次采样的间隔计算，
+    资源占用按整个进程树汇总。
+    每个间隔只采样一次，结果缓存并广播给所有订阅者，开销与订阅者数量无关。
+    进程运行期间持续采样，资源占用记录于多精度时间序列 `history`。
+    """
+
+    def __init__(
+        self,
+        processor: "CustomProcessor",
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ) -> None:
+        self.processor = processor
+        self.interval = interval
+        self.subscribers: Set["asyncio.Queue[ProcessInfo]"] = set()
+
+        self.history = TieredTimeSeries(RESOURCE_FIELDS)
+        self.latest: Optional[ProcessInfo] = None
+        self.resources: Dict[str, float] = dict()
+        self._latest_time: float = 0
+        self._handle: Optional[psutil.Process] = None
+        self._children: Dict[int, psutil.Process] = dict()
+        self._task: Optional[asyncio.Task] = None
+
+    def _get_handle(self, pid: int) -> Optional[psutil.Process]:
+        if self._handle is None or self._handle.pid != pid:
+            try:
+                self._handle = psutil.Process(pid)
+                # The first call only sets the baseline and always returns 0.0
+                self._handle.cpu_percent()
+            except psutil.Error:
+                self._handle = None
+        return self._handle
+
+    def _update_children(self, handle: psutil.Process) -> List[psutil.Process]:
+        try:
+            current = handle.children(recursive=True)
+        except psutil.Error:
+            return list(self._children.values())
+
+        children: Dict[int, psutil.Process] = dict()
+        for child in current:
+            known = self._children.get(child.pid)
+            # psutil compares pid and create time, so a reused pid is a new process
+            if known is None or known != child:
+                known = child
+                try:
+                    known.cpu_percent()
+                except psutil.Error:
+                    continue
+            children[child.pid] = known
+
+        self._children = children
+        return list(children.values())
+
+    def get_children(self) -> List[psutil.Process]:
+        """获取最近一次采样时仍存活的子孙进程，主进程退出后仍可用于清理遗留进程"""
+
+        return [child for child in self._children.values() if child.is_running()]
+
+    def clear_children(self) -> None:
+        self._children.clear()
+
+    def _sample_performance(self) -> Optional[ProcessPerformance]:
+        process = self.processor.process
+        if not process or process.returncode is not None:
+            self._handle = None
+            return None
+
+        handle = self._get_handle(process.pid)
+        if handle is None:
+            return None
+
+        try:
+            with handle.oneshot():
+                cpu = handle.cpu_percent()
+                mem = handle.memory_percent()
+                resources = self._sample_resources(handle)
+        except psutil.Error:
+            self._handle = None
+            return None
+
+        count = 1
+        for child in self._update_children(handle):
+            try:
+                with child.oneshot():
+                    child_cpu = child.cpu_percent()
+                    child_mem = child.memory_percent()
+                    child_resources = self._sample_resources(child)
+            except psutil.Error:
+                continue
+
+            cpu += child_cpu
+            mem += child_mem
+            for k, v in child_resources.items():
+                resources[k] = resources.get(k, 0) + v
+            count += 1
+
+        resources["processes"] = count
+        self.resources = resources
+        self.history.add(resources)
+
+        rss_limit = self.processor.limits.rss
+        if rss_limit and resources["rss"] > rss_limit:
+            self.processor.enforce_rss_limit(int(resources["rss"]))
+        return ProcessPerformance(cpu=cpu, mem=mem, processes=count)
+
+    @staticmethod
+    def _sample_resources(handle: psutil.Process) -> Dict[str, float]:
+        cpu_times = handle.cpu_times()
+        resources = {
+            "rss": handle.memory_info().rss,
+            "cpu_time": cpu_times.user + cpu_times.system,
+            "threads": handle.num_threads(),
+            "fds": handle.num_handles() if WINDOWS else handle.num_fds(),
+        }
+        # Not available on macOS
+        if hasattr(handle, "io_counters"):
+            io = handle.io_counters()
+            resources["io_read"] = io.read_bytes
+            resources["io_write"] = io.write_bytes
+        return resources
+
+    def sample(self) -> ProcessInfo:
+        processor = self.processor
+        process = processor.process
+        supervisor = processor.supervisor
+        health = processor.health
+        self.latest = ProcessInfo(
+            status_code=process.returncode if process else None,
+            total_log=processor.logs.get_count(),
+            is_running=processor.process_is_running,
+            performance=self._sample_performance(),
+            supervisor=supervisor.get_info() if supervisor else None,
+            health=health.get_info() if health.enabled else None,
+        )
+        self._latest_time = time.monotonic()
+        return self.latest
+
+    def get_status(self) -> ProcessInfo:
+        """获取进程状态，距上次采样不足一个间隔时直接返回缓存结果"""
+
+        if self.latest and time.monotonic() - self._latest_time < self.interval:
+            return self.latest
+        return self.sample()
+
+    def ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def subscribe(self) -> "asyncio.Queue[ProcessInfo]":
+        queue: "asyncio.Queue[ProcessInfo]" = asyncio.Queue(maxsize=1)
+        if self.latest:
+            queue.put_nowait(self.latest)
+        self.subscribers.add(queue)
+        self.ensure_running()
+        return queue
+
+    def unsubscribe(self, queue: "asyncio.Queue[ProcessInfo]") -> None:
+        self.subscribers.discard(queue)
+
+    async def _run(self) -> None:
+        # Keep sampling while the process runs so the history has no gaps
+        while self.subscribers or self.processor.process_is_running:
+            info = self.sample()
+            for queue in self.subscribers:
+                # Slow subscribers only ever see the newest snapshot
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(info)
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,59 @@
+import re
+from collections import deque
+from typing import Set, Dict, List, Deque, Tuple, Iterator
+
+from nb_cli_plugin_webui.api.dependencies.process.parse import strip_ansi
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> Set[str]:
+    return set(TOKEN_PATTERN.findall(strip_ansi(text).lower()))
+
+
+class LogSearchIndex:
+    """日志倒排索引，随日志写入增量更新，随日志淘汰同步清理"""
+
+    def __init__(self) -> None:
+        self.postings: Dict[str, Deque[int]] = dict()
+        self._entries: Deque[Tuple[int, Tuple[str, ...]]] = deque()
+
+    def add(self, seq: int, text: str) -> None:
+        tokens = tuple(tokenize(text))
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = deque()
+            posting.append(seq)
+        self._entries.append((seq, tokens))
+
+    def evict(self, first_seq: int) -> None:
+        """移除序号小于 `first_seq` 的日志"""
+
+        entries, postings = self._entries, self.postings
+        while entries and entries[0][0] < first_seq:
+            _, tokens = entries.popleft()
+            for token in tokens:
+                posting = postings[token]
+                posting.popleft()
+                if not posting:
+                    del postings[token]
+
+    def candidates(self, query: str) -> Tuple[List[str], Iterator[int]]:
+        """选出最稀有的词项，按序号从新到旧返回包含它的日志
+
+        Returns:
+            Tuple[List[str], Iterator[int]]: 查询词项及候选日志序号，
+            候选日志仍需由调用方校验其余词项
+        """
+
+        terms = TOKEN_PATTERN.findall(query.lower())
+        if not terms:
+            return terms, iter(())
+
+        postings = [self.postings.get(term) for term in terms]
+        if not all(postings):
+            return terms, iter(())
+
+        rarest = min(postings, key=len)  # type: ignore
+        return terms, reversed(rarest)  # type: ignore
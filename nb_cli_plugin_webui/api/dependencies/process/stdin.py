@@ -0,0 +1,76 @@
+import asyncio
+from typing import TYPE_CHECKING, List, Optional
+
+from nb_cli_plugin_webui.core.log import logger as log
+
+if TYPE_CHECKING:
+    from nb_cli_plugin_webui.api.dependencies.process.process import CustomProcessor
+
+DEFAULT_STDIN_QUEUE_SIZE: int = 256
+
+
+class StdinWriter:
+    """进程标准输入的有界写入队列
+
+    队列已满时 `put` 会等待，将背压传递给调用方；
+    写入任务每次取出队列中的全部数据合并为一次 `write_stdin`。
+    """
+
+    def __init__(
+        self,
+        processor: "CustomProcessor",
+        max_size: int = DEFAULT_STDIN_QUEUE_SIZE,
+    ) -> None:
+        self.processor = processor
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(max_size)
+        self.written: int = 0
+        self.dropped: int = 0
+        self.last_error: Optional[str] = None
+
+        self._task: Optional[asyncio.Task] = None
+
+    async def put(self, data: bytes) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        await self.queue.put(data)
+
+    async def join(self) -> None:
+        """等待已入队的数据全部写入"""
+
+        await self.queue.join()
+
+    def clear(self) -> None:
+        """丢弃尚未写入的数据，用于进程停止时"""
+
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.dropped += 1
+
+    async def close(self) -> None:
+        """丢弃尚未写入的数据并结束写入任务，用于进程停止、重启或脱离时"""
+
+        self.clear()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        queue = self.queue
+        while True:
+            chunks: List[bytes] = [await queue.get()]
+            while not queue.empty():
+                chunks.append(queue.get_nowait())
+
+            try:
+                if not self.processor.process_is_running:
+                    raise RuntimeError("Process is not running")
+                self.written += await self.processor.write_stdin(b"".join(chunks))
+            except Exception as err:
+                self.dropped += len(chunks)
+                self.last_error = repr(err)
+                log.warning(f"Write stdin failed: {err!r}")
+            finally:
+                for _ in chunks:
+                    queue.task_done()
@@ -0,0 +1,114 @@
+import time
+from collections import deque
+from typing import Deque, Optional
+
+from nb_cli_plugin_webui.models.domain.process import RestartPolicy
+from nb_cli_plugin_webui.models.schemas.process import ProcessSupervisorInfo
+
+DEFAULT_BACKOFF_BASE: float = 1
+DEFAULT_BACKOFF_MAX: float = 5 * 60
+DEFAULT_STABLE_TIME: float = 60
+DEFAULT_CRASH_LOOP_COUNT: int = 5
+DEFAULT_CRASH_LOOP_WINDOW: float = 5 * 60
+
+
+class ProcessSupervisor:
+    """进程守护，按重启策略决定进程退出后是否重启及重启前的等待时间
+
+    连续失败时等待时间按指数增长，进程稳定运行超过 `stable_time` 后重置；
+    `crash_loop_window` 内退出次数达到 `crash_loop_count` 视为崩溃循环，不再重启。
+    """
+
+    def __init__(
+        self,
+        policy: RestartPolicy = RestartPolicy.NEVER,
+        *,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        stable_time: float = DEFAULT_STABLE_TIME,
+        crash_loop_count: int = DEFAULT_CRASH_LOOP_COUNT,
+        crash_loop_window: float = DEFAULT_CRASH_LOOP_WINDOW,
+    ) -> None:
+        self.policy = policy
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stable_time = stable_time
+        self.crash_loop_count = crash_loop_count
+        self.crash_loop_window = crash_loop_window
+
+        self.restart_count = 0
+        self.consecutive_failures = 0
+        self.last_exit_code: Optional[int] = None
+        self.crash_loop = False
+        self.next_restart_time: Optional[float] = None
+
+        self._start_time: Optional[float] = None
+        self._exit_times: Deque[float] = deque()
+
+    def should_restart(self, exit_code: int) -> bool:
+        if self.policy == RestartPolicy.ALWAYS:
+            return True
+        if self.policy == RestartPolicy.ON_FAILURE:
+            return exit_code != 0
+        return False
+
+    def get_backoff(self) -> float:
+        delay = self.backoff_base * 2 ** max(self.consecutive_failures - 1, 0)
+        return min(delay, self.backoff_max)
+
+    def reset(self) -> None:
+        """清除失败计数及崩溃循环状态，用于手动启动"""
+
+        self.crash_loop = False
+        self.consecutive_failures = 0
+        self._exit_times.clear()
+
+    def on_start(self) -> None:
+        self.next_restart_time = None
+        self._start_time = time.monotonic()
+
+    def on_exit(self, exit_code: int) -> Optional[float]:
+        """记录进程退出
+
+        Args:
+            - exit_code (int): 进程退出码
+
+        Returns:
+            Optional[float]: 重启前需等待的秒数，不需要重启时为 None
+        """
+
+        now = time.monotonic()
+        self.last_exit_code = exit_code
+
+        uptime = now - self._start_time if self._start_time is not None else 0
+        self._start_time = None
+        if uptime >= self.stable_time:
+            self.consecutive_failures = 0
+        self.consecutive_failures += 1
+
+        exit_times = self._exit_times
+        exit_times.append(now)
+        while exit_times and exit_times[0] < now - self.crash_loop_window:
+            exit_times.popleft()
+
+        if not self.should_restart(exit_code):
+            return None
+
+        if len(exit_times) >= self.crash_loop_count:
+            self.crash_loop = True
+            return None
+
+        delay = self.get_backoff()
+        self.restart_count += 1
+        self.next_restart_time = time.time() + delay
+        return delay
+
+    def get_info(self) -> ProcessSupervisorInfo:
+        return ProcessSupervisorInfo(
+            policy=self.policy,
+            restart_count=self.restart_count,
+            consecutive_failures=self.consecutive_failures,
+            last_exit_code=self.last_exit_code,
+            crash_loop=self.crash_loop,
+            next_restart_time=self.next_restart_time,
+        )
@@ -0,0 +1,73 @@
+import asyncio
+from typing import List, Iterable
+
+import psutil
+from nb_cli.handlers.process import terminate_process
+
+DEFAULT_TERMINATE_TIMEOUT: float = 10
+
+
+def get_descendants(pid: int) -> List[psutil.Process]:
+    try:
+        return psutil.Process(pid).children(recursive=True)
+    except psutil.Error:
+        return list()
+
+
+async def terminate_processes(
+    processes: Iterable[psutil.Process], timeout: float = DEFAULT_TERMINATE_TIMEOUT
+) -> None:
+    """向进程发送终止信号，超时仍未退出的进程将被强制结束"""
+
+    alive: List[psutil.Process] = list()
+    for process in processes:
+        try:
+            process.terminate()
+        except psutil.Error:
+            continue
+        alive.append(process)
+
+    if alive:
+        await asyncio.get_running_loop().run_in_executor(
+            None, _wait_or_kill, alive, timeout
+        )
+
+
+def _wait_or_kill(processes: List[psutil.Process], timeout: float) -> None:
+    _, alive = psutil.wait_procs(processes, timeout=timeout)
+    for process in alive:
+        try:
+            process.kill()
+        except psutil.Error:
+            continue
+    psutil.wait_procs(alive, timeout=1)
+
+
+async def terminate_process_tree(
+    process: asyncio.subprocess.Process,
+    known: Iterable[psutil.Process] = (),
+    timeout: float = DEFAULT_TERMINATE_TIMEOUT,
+) -> None:
+    """终止进程及其全部子孙进程
+
+    Args:
+        - process (asyncio.subprocess.Process): 主进程
+        - known (Iterable[psutil.Process]): 已知的子孙进程，
+          用于清理主进程退出后被系统收养的遗留进程
+        - timeout (float): 等待进程退出的时间（秒）
+    """
+
+    descendants = {child.pid: child for child in known}
+    if process.returncode is None:
+        descendants.update((child.pid, child) for child in get_descendants(process.pid))
+
+    try:
+        await asyncio.wait_for(terminate_process(process), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+
+    # Helpers may ignore the signal or have been re-parented away from the bot
+    await terminate_processes(
+        [child for child in descendants.values() if child.is_running()], timeout
+    )
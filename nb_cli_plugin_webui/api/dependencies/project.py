@@ -33,6 +33,16 @@ class NonebotProjectManager:
         "plugin_dirs",
         "use_run_script",
         "run_script_name",
+        "restart_policy",
+        "limit_memory",
+        "limit_rss",
+        "limit_cpu_time",
+        "limit_nofile",
+        "nice",
+        "health_probe",
+        "health_log_pattern",
+        "health_port",
+        "health_http_path",
     }
 
     def __init__(
@@ -112,7 +122,8 @@ class NonebotProjectManager:
     def modify_meta(self, k: str, v: Any) -> None:
         if k in self.meta_modifiable_key:
             data = self.read()
-            setattr(data, k, v)
+            # Rebuild the model so the new value is validated before storing
+            data = data.parse_obj(dict(data.dict(), **{k: v}))
             self.store(data)
         else:
             raise InvalidKeyException
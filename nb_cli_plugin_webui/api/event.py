@@ -2,13 +2,21 @@ from typing import Callable
 
 from fastapi import FastAPI
 
+from nb_cli_plugin_webui.core.configs.config import config
 from nb_cli_plugin_webui.utils.apscheduler import scheduler
-from nb_cli_plugin_webui.api.dependencies.process.manager import ProcessManager
+from nb_cli_plugin_webui.utils.performance import HostFactsCache
+from nb_cli_plugin_webui.api.dependencies.performance import HostMetricsStore
+from nb_cli_plugin_webui.api.dependencies.process.archive import LogArchiveManager
 from nb_cli_plugin_webui.api.dependencies.store.manage import (
     DRIVER_MANAGER,
     PLUGIN_MANAGER,
     ADAPTER_MANAGER,
 )
+from nb_cli_plugin_webui.api.dependencies.process.lifecycle import (
+    restore_projects,
+    stop_all_projects,
+    detach_all_projects,
+)
 
 
 def add_event_handler(app: FastAPI) -> FastAPI:
@@ -19,12 +27,16 @@ def add_event_handler(app: FastAPI) -> FastAPI:
 
 def create_start_app_handler() -> Callable:
     async def start_app():
+        HostFactsCache.refresh()
+        HostMetricsStore.load()
         scheduler.start()
 
         await PLUGIN_MANAGER.load_item()
         await ADAPTER_MANAGER.load_item()
         await DRIVER_MANAGER.load_item()
 
+        await restore_projects()
+
     return start_app
 
 
@@ -32,9 +44,12 @@ def create_stop_app_handler() -> Callable:
     async def stop_app():
         scheduler.shutdown()
 
-        for process_id in ProcessManager.processes:
-            process = ProcessManager.get_process(process_id)
-            if process and process.process_is_running:
-                await process.stop()
+        if config.read().process.detach_on_exit:
+            await detach_all_projects()
+        else:
+            await stop_all_projects()
+
+        await LogArchiveManager.flush_all()
+        HostMetricsStore.save()
 
     return stop_app
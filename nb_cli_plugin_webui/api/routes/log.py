@@ -1,43 +1,164 @@
-from fastapi import APIRouter
+import asyncio
+from typing import List, Optional
+
+from fastapi.responses import Response
+from fastapi import Query, APIRouter, HTTPException, status
 from fastapi.websockets import WebSocketState, WebSocketDisconnect
 
-from nb_cli_plugin_webui.patch import WebSocket
-from nb_cli_plugin_webui.models.domain.process import ProcessLog
-from nb_cli_plugin_webui.models.schemas.log import LogHistoryResponse
-from nb_cli_plugin_webui.api.dependencies.process.log import LoggerStorageFather
+from nb_cli_plugin_webui.core.log import logger
+from nb_cli_plugin_webui.patch import WebSocket, get_encoding
+from nb_cli_plugin_webui.api.dependencies.process.archive import LogArchiveManager
+from nb_cli_plugin_webui.models.domain.process import LogLevel, CustomLog, LogRecord
+from nb_cli_plugin_webui.api.dependencies.process.log import (
+    DEFAULT_SEARCH_LIMIT,
+    LoggerStorageFather,
+)
+from nb_cli_plugin_webui.models.schemas.log import (
+    LogSearchResponse,
+    LogArchiveResponse,
+    LogHistoryResponse,
+)
 
 router = APIRouter()
 
 
-@router.get("/logs/history", response_model=LogHistoryResponse)
-async def get_logs_history(log_key: str, log_count: int = 0) -> LogHistoryResponse:
-    log = LoggerStorageFather[ProcessLog].get_storage(log_key)
-    result = list()
-    if log:
-        result = result = log.get_logs(limit=log_count, is_dict=True)
+def _history_response(
+    logs: List[LogRecord], first_seq: int = 0, last_seq: int = 0
+) -> Response:
+    # Reuse the serialized form cached on each log instead of re-encoding it
+    detail = ",".join(item.json() for item in logs)
+    return Response(
+        content=f'{{"detail":[{detail}],"first_seq":{first_seq},"last_seq":{last_seq}}}',
+        media_type="application/json",
+    )
+
+
+@router.get("/logs/history", responses={200: {"model": LogHistoryResponse}})
+async def get_logs_history(
+    log_key: str,
+    log_count: int = 0,
+    since_seq: Optional[int] = None,
+    before_seq: Optional[int] = None,
+    level: List[LogLevel] = Query(default=list()),
+) -> Response:
+    log = LoggerStorageFather[LogRecord].get_storage(log_key)
+    if log is None:
+        return _history_response(list())
+
+    first_seq, last_seq, result = log.get_logs_slice(
+        since_seq=since_seq, before_seq=before_seq, limit=log_count, levels=list(level)
+    )
+    return _history_response(result, first_seq, last_seq)
 
-    return LogHistoryResponse(detail=result)
+
+@router.get("/logs/archive", response_model=LogArchiveResponse)
+async def get_logs_archive(
+    log_key: str,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    since_seq: Optional[int] = None,
+    log_count: int = 0,
+) -> LogArchiveResponse:
+    archive = await LogArchiveManager.find_archive(log_key)
+    if archive is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无法找到对应的日志")
+
+    result = await archive.query(
+        start_time=start_time, end_time=end_time, since_seq=since_seq, limit=log_count
+    )
+
+    return LogArchiveResponse(detail=result)
+
+
+@router.get("/logs/search", response_model=LogSearchResponse)
+async def search_logs(
+    log_key: str,
+    query: str,
+    level: List[LogLevel] = Query(default=list()),
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    log_count: int = DEFAULT_SEARCH_LIMIT,
+) -> LogSearchResponse:
+    log = LoggerStorageFather[LogRecord].get_storage(log_key)
+    if log is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无法找到对应的日志")
+
+    result = log.search(
+        query,
+        levels=list(level),
+        start_time=start_time,
+        end_time=end_time,
+        limit=log_count,
+    )
+
+    return LogSearchResponse(detail=[dict(log.dict(), seq=seq) for seq, log in result])
 
 
 @router.websocket("/logs/{log_key}")
-async def get_logs_realtime(websocket: WebSocket, log_key: str):
+async def get_logs_realtime(
+    websocket: WebSocket,
+    log_key: str,
+    batch: bool = False,
+    level: List[LogLevel] = Query(default=list()),
+):
     await websocket.accept()
 
-    log = LoggerStorageFather[ProcessLog].get_storage(log_key)
+    log = LoggerStorageFather[LogRecord].get_storage(log_key)
     if log is None:
         await websocket.close()
         return
 
-    async def log_listener(log: ProcessLog):
-        await websocket.send_json(log.dict())
+    subscriber = log.subscribe()
+    is_json = get_encoding(websocket) == "json"
 
-    log.register_listener(log_listener)
+    async def log_sender():
+        while websocket.client_state == WebSocketState.CONNECTED:
+            dropped, logs = await subscriber.get_batch()
+            items = [item for item in logs if not level or item.level in level]
+            if dropped:
+                lag_log = CustomLog(
+                    level=LogLevel.WARNING,
+                    message=f"Log stream lagging, {dropped} lines dropped.",
+                )
+                items.insert(0, lag_log)
+
+            if not is_json:
+                data = [item.dict() for item in items]
+                if batch and data:
+                    await websocket.send_data(data)
+                else:
+                    for item in data:
+                        await websocket.send_data(item)
+            elif batch and items:
+                await websocket.send_text(f"[{','.join(i.json() for i in items)}]")
+            else:
+                for item in items:
+                    await websocket.send_text(item.json())
 
+    async def receiver():
+        try:
+            while websocket.client_state == WebSocketState.CONNECTED:
+                _ = await websocket.receive()
+        except WebSocketDisconnect:
+            pass
+
+    # Whichever side ends first, the other one is stopped and the socket released
+    tasks = {asyncio.create_task(log_sender()), asyncio.create_task(receiver())}
     try:
-        while websocket.client_state == WebSocketState.CONNECTED:
-            _ = await websocket.receive()
-    except WebSocketDisconnect:
-        pass
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            if not task.cancelled() and task.exception():
+                logger.warning(f"Log stream {log_key} closed: {task.exception()!r}")
     finally:
-        log.unregister_listener(log_listener)
+        for task in tasks:
+            task.cancel()
+        log.unsubscribe(subscriber)
+        if websocket.client_state == WebSocketState.CONNECTED:
+            try:
+                await websocket.close()
+            except RuntimeError:
+                pass
     return
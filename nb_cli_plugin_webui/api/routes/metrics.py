@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from starlette.responses import Response
+
+from nb_cli_plugin_webui.utils.metrics import MetricsWriter
+from nb_cli_plugin_webui.api.dependencies.metrics import collect_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    return Response(collect_metrics(), media_type=MetricsWriter.content_type)
@@ -1,24 +1,106 @@
+import time
 import asyncio
+from typing import Optional
 
 from fastapi import APIRouter
 from fastapi.websockets import WebSocketState
 
 from nb_cli_plugin_webui.patch import WebSocket
-from nb_cli_plugin_webui.api.dependencies.performance import get_system_stats
-from nb_cli_plugin_webui.models.schemas.performance import SystemStatsResponse
+from nb_cli_plugin_webui.utils.performance import HostFactsCache
+from nb_cli_plugin_webui.models.schemas.performance import (
+    HostFacts,
+    HostMetricsPoint,
+    HostMetricsResponse,
+    SystemStatsResponse,
+)
+from nb_cli_plugin_webui.api.dependencies.performance import (
+    SYSTEM_STATS_INTERVAL,
+    HostMetricsStore,
+    SystemStatsSampler,
+    SystemStatsDeltaEncoder,
+)
 
 router = APIRouter()
 
 
+@router.get("/facts", response_model=HostFacts)
+async def get_host_facts() -> HostFacts:
+    return HostFactsCache.get()
+
+
+@router.post("/facts/refresh", response_model=HostFacts)
+async def refresh_host_facts() -> HostFacts:
+    return await asyncio.get_running_loop().run_in_executor(
+        None, HostFactsCache.refresh
+    )
+
+
+@router.get("/history", response_model=HostMetricsResponse)
+async def get_host_metrics_history(
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    resolution: Optional[float] = None,
+) -> HostMetricsResponse:
+    used_resolution, points = HostMetricsStore.history.query(
+        start_time, end_time, resolution
+    )
+    return HostMetricsResponse(
+        resolution=used_resolution,
+        detail=[HostMetricsPoint(time=ts, **values) for ts, values in points],
+    )
+
+
 @router.websocket("/ws")
 async def _(websocket: WebSocket):
     await websocket.accept()
 
+    queue = SystemStatsSampler.subscribe()
     try:
         while websocket.client_state == WebSocketState.CONNECTED:
-            data = await get_system_stats()
-            await websocket.send_json(SystemStatsResponse(system_stats=data).dict())
-            await asyncio.sleep(1)
+            data = await queue.get()
+            await websocket.send_data(SystemStatsResponse(system_stats=data).dict())
+    except Exception:
+        await websocket.close()
+    finally:
+        SystemStatsSampler.unsubscribe(queue)
+    return
+
+
+@router.websocket("/ws/delta")
+async def _(
+    websocket: WebSocket,
+    interval: float = SYSTEM_STATS_INTERVAL,
+    fields: Optional[str] = None,
+):
+    """增量推送系统状态
+
+    首条消息 `full` 为真，包含全部所选字段；之后仅推送发生变化的字段，没有变化时不推送。
+
+    Args:
+        - interval (float): 推送间隔（秒），不小于采样间隔
+        - fields (Optional[str]): 以逗号分隔的字段，如 `cpu.percent,mem`
+    """
+
+    await websocket.accept()
+
+    encoder = SystemStatsDeltaEncoder(fields.split(",") if fields else None)
+    # Ticks jitter around the sampling interval, allow half an interval early
+    min_gap = max(interval, SYSTEM_STATS_INTERVAL) - SYSTEM_STATS_INTERVAL / 2
+    last_send = float()
+    queue = SystemStatsSampler.subscribe()
+    try:
+        while websocket.client_state == WebSocketState.CONNECTED:
+            await queue.get()
+            now = time.monotonic()
+            if now - last_send < min_gap:
+                continue
+
+            data = encoder.encode(SystemStatsSampler.latest_flat)
+            last_send = now
+            if data is not None:
+                await websocket.send_data(data)
     except Exception:
         await websocket.close()
+    finally:
+        SystemStatsSampler.unsubscribe(queue)
     return
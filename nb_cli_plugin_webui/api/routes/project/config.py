@@ -3,6 +3,7 @@ import json
 from typing import List
 from pathlib import Path
 
+from pydantic import ValidationError
 from fastapi import Body, APIRouter, HTTPException, status
 
 from nb_cli_plugin_webui.exceptions import NonebotProjectIsNotExist
@@ -278,7 +279,13 @@ async def write_dotenv_file(
             setattr(data, "v", bool(data.v))
 
         target_config = data.k.split(":")[-1]
-        project.modify_meta(target_config, data.v)
+        try:
+            project.modify_meta(target_config, data.v)
+        except ValidationError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"设置项 {target_config} 的值无效",
+            )
         return
 
     project_dir = Path(project_detail.project_dir)
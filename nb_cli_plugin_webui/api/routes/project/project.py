@@ -1,28 +1,27 @@
 import os
-import sys
+import re
 import json
 import shutil
 import asyncio
+import subprocess
 from pathlib import Path
 from typing import Dict, List
 
 from nb_cli.config import ConfigManager
+from nb_cli.handlers.project import create_project
 from nb_cli.handlers.venv import create_virtualenv
-from nb_cli.handlers.meta import get_default_python
-from nb_cli.config import SimpleInfo as CliSimpleInfo
 from nb_cli.cli.commands.project import ProjectContext
 from fastapi import Body, APIRouter, HTTPException, status
-from nb_cli.handlers.project import create_project, generate_run_script
+from fastapi.websockets import WebSocketState, WebSocketDisconnect
 
+from nb_cli_plugin_webui.patch import WebSocket
 from nb_cli_plugin_webui.api.dependencies.files import BASE_DIR
 from nb_cli_plugin_webui.models.schemas.store import SimpleInfo
 from nb_cli_plugin_webui.utils import generate_complexity_string
-from nb_cli_plugin_webui.exceptions import NonebotProjectIsNotExist
 from nb_cli_plugin_webui.api.dependencies.pip import call_pip_install
 from nb_cli_plugin_webui.models.domain.process import LogLevel, CustomLog
 from nb_cli_plugin_webui.api.dependencies.project import NonebotProjectManager
 from nb_cli_plugin_webui.api.dependencies.process.manager import ProcessManager
-from nb_cli_plugin_webui.api.dependencies.process.process import CustomProcessor
 from nb_cli_plugin_webui.api.dependencies.store.manage import (
     PLUGIN_MANAGER,
     ADAPTER_MANAGER,
@@ -31,12 +30,26 @@ from nb_cli_plugin_webui.api.dependencies.process.log import (
     LoggerStorage,
     LoggerStorageFather,
 )
+from nb_cli_plugin_webui.exceptions import (
+    ProcessIsNotExist,
+    ProcessAlreadyRunning,
+    NonebotProjectIsNotExist,
+    NonebotProjectModuleMissing,
+)
+from nb_cli_plugin_webui.api.dependencies.process.lifecycle import (
+    DEFAULT_BULK_PARALLELISM,
+    BulkAction,
+    run_project,
+    stop_project,
+    run_bulk_action,
+)
 from nb_cli_plugin_webui.models.schemas.project import (
     AddProjectData,
     CreateProjectData,
     AddProjectResponse,
     NonebotProjectMeta,
     ProjectListResponse,
+    BulkOperationResponse,
     CreateProjectResponse,
     DeleteProjectResponse,
 )
@@ -390,101 +403,70 @@ async def get_nonebot_project_detail(project_id: str):
 
 @router.post("/run")
 async def run_nonebot_project(project_id: str = Body(embed=True)) -> None:
-    project = NonebotProjectManager(project_id)
     try:
-        project_detail = project.read()
+        await run_project(project_id)
     except NonebotProjectIsNotExist:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=f"实例 {project_id=} 不存在"
         )
-
-    if not project_detail.adapters:
+    except NonebotProjectModuleMissing as err:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(err))
+    except ProcessAlreadyRunning:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="实例未安装任何适配器"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"实例 {project_id=} 正在运行中",
         )
-    if not project_detail.drivers:
+    except (OSError, subprocess.SubprocessError) as err:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="实例未安装任何驱动器"
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"实例启动失败: {err}"
         )
-
-    project_dir = Path(project_detail.project_dir)
-
-    env = os.environ.copy()
-    env["TERM"] = "xterm-color"
-    if sys.platform == "win32":
-        venv_path = project_dir / Path(".venv/Scripts")
-        env["PATH"] = f"{venv_path.absolute()};" + env["PATH"]
-    else:
-        venv_path = project_dir / Path(".venv/bin")
-        env["PATH"] = f"{venv_path.absolute()}:" + env["PATH"]
-
-    process = ProcessManager.get_process(project_id)
-    if process:
-        if process.process_is_running:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"实例 {project_id=} 正在运行中",
-            )
-        else:
-            await process.start()
-    else:
-        python_path = project.config_manager.python_path
-        if python_path is None:
-            python_path = await get_default_python()
-
-        raw_adapters = project_detail.adapters
-        new_adapters: List[CliSimpleInfo] = list()
-        for adapter in raw_adapters:
-            new_adapters.append(
-                CliSimpleInfo(name=adapter.name, module_name=adapter.module_name)
-            )
-        run_script = await generate_run_script(
-            adapters=new_adapters,
-            builtin_plugins=project_detail.builtin_plugins,
+    except re.error as err:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"健康检查日志匹配规则无效: {err}"
         )
 
-        if project_detail.use_run_script:
-            run_script_file = project_dir / project_detail.run_script_name
-            if not run_script_file.is_file():
-                with open(run_script_file, "w", encoding="utf-8") as w:
-                    w.write(run_script)
-
-            process = CustomProcessor(
-                python_path,
-                run_script_file,
-                cwd=project_dir,
-                env=env,
-                log_rotation_time=5 * 60,
-            )
-        else:
-            process = CustomProcessor(
-                python_path,
-                "-c",
-                run_script,
-                cwd=project_dir,
-                env=env,
-                log_rotation_time=5 * 60,
-            )
-
-        log = process.get_log_record()
-        LoggerStorageFather.add_storage(log, project_id)
-        ProcessManager.add_process(process, project_id)
-        await process.start()
-
 
 @router.post("/stop")
 async def stop_nonebot_project(project_id: str = Body(embed=True)):
-    process = ProcessManager.get_process(project_id)
-    if process is None:
+    try:
+        await stop_project(project_id)
+    except ProcessIsNotExist:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="无法找到对应的实例进程"
         )
 
-    await process.stop()
-
     return {"detail": "OK"}
 
 
+@router.post("/bulk/{action}", response_model=BulkOperationResponse)
+async def bulk_nonebot_project_operation(
+    action: BulkAction,
+    project_ids: List[str] = Body(default=list(), embed=True),
+    parallelism: int = Body(default=DEFAULT_BULK_PARALLELISM, embed=True, ge=1),
+) -> BulkOperationResponse:
+    if not project_ids:
+        try:
+            project_ids = list(NonebotProjectManager.get_projects())
+        except NonebotProjectIsNotExist:
+            project_ids = list()
+
+    log = LoggerStorage()
+    log_key = generate_complexity_string(8)
+    LoggerStorageFather.add_storage(log, log_key)
+
+    async def process():
+        # Time for frontend ready
+        await asyncio.sleep(1)
+        await run_bulk_action(action, project_ids, parallelism, log)
+
+    asyncio.create_task(process())
+    asyncio.get_running_loop().call_later(
+        600, LoggerStorageFather.storages.pop, log_key
+    )
+
+    return BulkOperationResponse(log_key=log_key)
+
+
 @router.post("/write")
 async def write_nonebot_project_process(
     project_id: str = Body(embed=True), content: str = Body(embed=True)
@@ -509,3 +491,42 @@ async def write_nonebot_project_process(
         await process.start()
 
     return {"detail": result}
+
+
+@router.websocket("/write/{project_id}")
+async def write_nonebot_project_process_stream(
+    websocket: WebSocket, project_id: str, raw: bool = False, ack: bool = False
+) -> None:
+    await websocket.accept()
+
+    process = ProcessManager.get_process(project_id)
+    if process is None:
+        await websocket.close()
+        return
+
+    writer = process.stdin_writer
+    try:
+        while websocket.client_state == WebSocketState.CONNECTED:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("bytes") is not None:
+                data = message["bytes"]
+            else:
+                text = message.get("text") or str()
+                data = (text if raw else text + os.linesep).encode()
+
+            # Blocks while the queue is full, so the client is throttled by TCP
+            await writer.put(data)
+            if ack:
+                await websocket.send_data(
+                    {
+                        "queued": writer.queue.qsize(),
+                        "written": writer.written,
+                        "dropped": writer.dropped,
+                    }
+                )
+    except WebSocketDisconnect:
+        pass
+    return
@@ -1,10 +1,15 @@
-import asyncio
+from typing import Optional
 
 from fastapi.websockets import WebSocketState
-from fastapi import APIRouter, WebSocket, HTTPException, status
+from fastapi import APIRouter, HTTPException, status
 
-from nb_cli_plugin_webui.models.schemas.process import ProcessInfo
+from nb_cli_plugin_webui.patch import WebSocket
 from nb_cli_plugin_webui.api.dependencies.process.manager import ProcessManager
+from nb_cli_plugin_webui.models.schemas.process import (
+    ProcessInfo,
+    ProcessResourcePoint,
+    ProcessHistoryResponse,
+)
 
 router = APIRouter()
 
@@ -18,6 +23,26 @@ async def get_nonebot_project_process_status(project_id: str) -> ProcessInfo:
     return process.get_status()
 
 
+@router.get("/history", response_model=ProcessHistoryResponse)
+async def get_nonebot_project_process_history(
+    project_id: str,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    resolution: Optional[float] = None,
+) -> ProcessHistoryResponse:
+    process = ProcessManager.get_process(project_id)
+    if process is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无法找到实例进程")
+
+    used_resolution, points = process.status_sampler.history.query(
+        start_time, end_time, resolution
+    )
+    return ProcessHistoryResponse(
+        resolution=used_resolution,
+        detail=[ProcessResourcePoint(time=ts, **values) for ts, values in points],
+    )
+
+
 @router.websocket("/{project_id}")
 async def get_nonebot_project_process_status_realtime(
     websocket: WebSocket, project_id: str
@@ -28,11 +53,13 @@ async def get_nonebot_project_process_status_realtime(
     if process is None:
         return
 
+    queue = process.status_sampler.subscribe()
     try:
         while websocket.client_state == WebSocketState.CONNECTED:
-            data = process.get_status()
-            await websocket.send_json(data.dict())
-            await asyncio.sleep(1)
+            data = await queue.get()
+            await websocket.send_data(data.dict())
     except Exception:
         await websocket.close()
+    finally:
+        process.status_sampler.unsubscribe(queue)
     return
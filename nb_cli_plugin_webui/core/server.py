@@ -21,10 +21,11 @@ async def run_server(host: str, port: int):
 
     server = uvicorn.Server(
         uvicorn.Config(
-            "nb_cli_plugin_webui.api:app",
+            "nb_cli_plugin_webui.api.app:app",
             host=host,
             port=port,
             log_config=LOGGING_CONFIG,
+            ws_per_message_deflate=True,
         )
     )
 
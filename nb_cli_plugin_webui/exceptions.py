@@ -32,3 +32,11 @@ class NonebotProjectIsNotExist(Exception):
 
 class InvalidKeyException(Exception):
     """invalid key is provided."""
+
+
+class NonebotProjectModuleMissing(Exception):
+    """target nonebot project has no adapter or driver installed."""
+
+
+class ProcessIsNotExist(Exception):
+    """target process is not exist."""
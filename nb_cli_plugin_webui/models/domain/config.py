@@ -28,12 +28,27 @@ class ServerConfig(BaseModel):
         }
 
 
+class ProcessConfig(BaseModel):
+    # Leave bots running when the WebUI exits and re-adopt them on the next start
+    detach_on_exit: bool = False
+    # Start bots that were running when the WebUI exited but did not survive it,
+    # off by default so a plain restart of the WebUI never starts bots by itself
+    restore_on_start: bool = False
+
+
+class MetricsConfig(BaseModel):
+    # Serve /metrics without authentication so Prometheus can scrape it
+    public: bool = False
+
+
 class WebUIConfig(BaseModel):
     hashed_token: str = str()
     salt: SecretStr = SecretStr(str())
     secret_key: SecretStr
     base_dir: str = str()
     server: ServerConfig = ServerConfig(host="localhost", port="12345")
+    process: ProcessConfig = ProcessConfig()
+    metrics: MetricsConfig = MetricsConfig()
 
     def to_json(self) -> str:
         return json.dumps(self.dict(), cls=SecretStrJSONEncoder)
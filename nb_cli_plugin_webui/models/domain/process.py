@@ -1,7 +1,11 @@
+import json
 from enum import Enum
 from datetime import datetime
+from time import time as timestamp
+from time import strftime, localtime
+from typing import Any, Dict, List, Optional
 
-from pydantic import Field, BaseModel
+from pydantic import Field, BaseModel, conint
 
 from nb_cli_plugin_webui.core.log import STDOUT
 
@@ -9,19 +13,151 @@ from nb_cli_plugin_webui.core.log import STDOUT
 class LogLevel(str, Enum):
     STDOUT = STDOUT.name
 
+    TRACE = "TRACE"
+    DEBUG = "DEBUG"
     INFO = "INFO"
+    SUCCESS = "SUCCESS"
     WARNING = "WARNING"
     ERROR = "ERROR"
-    DEBUG = "DEBUG"
+    CRITICAL = "CRITICAL"
+
+
+class RestartPolicy(str, Enum):
+    ALWAYS = "always"
+    ON_FAILURE = "on-failure"
+    NEVER = "never"
 
 
 class CustomLog(BaseModel):
-    time: datetime = Field(
+    time: str = Field(
         default_factory=lambda: datetime.now().strftime("%H:%M:%S.%f")[:-3]
     )
     level: str = str()
     message: str
+    # Assigned when the log is added to a `LoggerStorage`
+    seq: Optional[int] = None
 
 
 class ProcessLog(CustomLog):
     level: LogLevel = LogLevel.STDOUT
+    module: str = str()
+
+
+class LogRecord:
+    """进程输出日志的轻量表示，字段与 `ProcessLog` 一致，序列化结果只计算一次"""
+
+    __slots__ = (
+        "created",
+        "level",
+        "message",
+        "module",
+        "seq",
+        "_time",
+        "_dict",
+        "_json",
+    )
+
+    def __init__(
+        self,
+        message: str,
+        level: LogLevel = LogLevel.STDOUT,
+        module: str = str(),
+        time: Optional[str] = None,
+    ) -> None:
+        self.created = timestamp()
+        self.level = level
+        self.message = message
+        self.module = module
+        # Assigned when the log is added to a `LoggerStorage`, before serializing
+        self.seq: Optional[int] = None
+        self._time = time
+        self._dict: Optional[Dict[str, Any]] = None
+        self._json: Optional[str] = None
+
+    @property
+    def time(self) -> str:
+        if self._time is None:
+            created = self.created
+            self._time = strftime("%H:%M:%S", localtime(created)) + (
+                ".%03d" % (created % 1 * 1000)
+            )
+        return self._time
+
+    def dict(self) -> Dict[str, Any]:
+        if self._dict is None:
+            self._dict = {
+                "time": self.time,
+                "level": self.level.value,
+                "message": self.message,
+                "module": self.module,
+                "seq": self.seq,
+            }
+        return self._dict
+
+    def json(self) -> str:
+        if self._json is None:
+            self._json = json.dumps(self.dict(), ensure_ascii=False)
+        return self._json
+
+
+class LogArchiveCheckpoint(BaseModel):
+    seq: int
+    time: float
+    # Byte offset in the raw file, or of the gzip member once compressed
+    offset: int
+
+
+class LogArchiveSegment(BaseModel):
+    name: str
+    first_seq: int
+    last_seq: int
+    first_time: float
+    last_time: float
+    size: int = 0
+    count: int = 0
+    compressed: bool = False
+    checkpoints: List[LogArchiveCheckpoint] = list()
+
+
+class LogArchiveIndex(BaseModel):
+    segments: List[LogArchiveSegment]
+
+
+class ProcessResourceLimits(BaseModel):
+    address_space: int = 0
+    rss: int = 0
+    cpu_time: int = 0
+    nofile: int = 0
+    nice: conint(ge=0, le=19) = 0  # type: ignore
+
+
+class HealthProbeType(str, Enum):
+    NONE = "none"
+    LOG = "log"
+    TCP = "tcp"
+    HTTP = "http"
+
+
+class HealthProbeConfig(BaseModel):
+    type: HealthProbeType = HealthProbeType.NONE
+    log_pattern: str = "Application startup complete"
+    host: str = "127.0.0.1"
+    port: int = 8080
+    http_path: str = "/"
+    interval: float = 10
+    timeout: float = 3
+    failure_threshold: int = 3
+    startup_timeout: float = 120
+
+
+class ProcessRecord(BaseModel):
+    pid: int
+    create_time: float
+    fingerprint: str
+    project_id: str = str()
+    # Read position in the output file of a detached process
+    output_offset: Optional[int] = None
+
+
+class ProcessRegistryData(BaseModel):
+    processes: Dict[str, ProcessRecord]
@@ -3,3 +3,13 @@ from pydantic import BaseModel
 
 class LogHistoryResponse(BaseModel):
     detail: list
+    first_seq: int = 0
+    last_seq: int = 0
+
+
+class LogArchiveResponse(BaseModel):
+    detail: list
+
+
+class LogSearchResponse(BaseModel):
+    detail: list
@@ -41,6 +41,14 @@ class NetInfo(BaseModel):
     speed: List[int]
 
 
+class HostFacts(BaseModel):
+    platform: PlatformInfo
+    cpu_name: str
+    cpu_count: int
+    cpu_max_freq: str
+    disk_devices: List[str]
+
+
 class SystemStats(BaseModel):
     platform: PlatformInfo
     cpu: CpuInfo
@@ -51,3 +59,19 @@ class SystemStats(BaseModel):
 
 class SystemStatsResponse(BaseModel):
     system_stats: SystemStats
+
+
+class HostMetricsPoint(BaseModel):
+    time: float
+    cpu: float = 0
+    mem: float = 0
+    disk: float = 0
+    disk_read: float = 0
+    disk_write: float = 0
+    net_sent: float = 0
+    net_recv: float = 0
+
+
+class HostMetricsResponse(BaseModel):
+    resolution: float
+    detail: List[HostMetricsPoint]
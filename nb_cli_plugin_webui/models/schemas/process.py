@@ -1,11 +1,33 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
+from nb_cli_plugin_webui.models.domain.process import RestartPolicy, HealthProbeType
+
 
 class ProcessPerformance(BaseModel):
     cpu: float
     mem: float
+    processes: int = 1
+
+
+class ProcessSupervisorInfo(BaseModel):
+    policy: RestartPolicy
+    restart_count: int
+    consecutive_failures: int
+    last_exit_code: Optional[int]
+    crash_loop: bool
+    next_restart_time: Optional[float]
+
+
+class ProcessHealthInfo(BaseModel):
+    probe: HealthProbeType
+    ready: bool
+    healthy: Optional[bool]
+    ready_time: Optional[float]
+    last_check_time: Optional[float]
+    consecutive_failures: int
+    last_error: Optional[str]
 
 
 class ProcessInfo(BaseModel):
@@ -13,3 +35,21 @@ class ProcessInfo(BaseModel):
     total_log: int
     is_running: bool
     performance: Optional[ProcessPerformance]
+    supervisor: Optional[ProcessSupervisorInfo] = None
+    health: Optional[ProcessHealthInfo] = None
+
+
+class ProcessResourcePoint(BaseModel):
+    time: float
+    rss: float = 0
+    cpu_time: float = 0
+    threads: float = 0
+    fds: float = 0
+    io_read: float = 0
+    io_write: float = 0
+    processes: float = 0
+
+
+class ProcessHistoryResponse(BaseModel):
+    resolution: float
+    detail: List[ProcessResourcePoint]
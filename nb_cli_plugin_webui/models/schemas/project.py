@@ -1,10 +1,12 @@
+import re
 from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, conint, validator
 
 from nb_cli_plugin_webui.models.schemas.store import Driver
 from nb_cli_plugin_webui.models.schemas.store import Adapter, SimpleInfo
 from nb_cli_plugin_webui.models.schemas.store import Plugin as BasePlugin
+from nb_cli_plugin_webui.models.domain.process import RestartPolicy, HealthProbeType
 
 
 class Plugin(BasePlugin):
@@ -27,6 +29,29 @@ class NonebotProjectMeta(BaseModel):
     use_run_script: bool = False
     run_script_name: str = "bot.py"
 
+    restart_policy: RestartPolicy = RestartPolicy.NEVER
+
+    # Resource limits, 0 means unlimited. Memory in MiB, CPU time in seconds
+    limit_memory: int = 0
+    limit_rss: int = 0
+    limit_cpu_time: int = 0
+    limit_nofile: int = 0
+    nice: conint(ge=0, le=19) = 0  # type: ignore
+
+    # Readiness and liveness probe, port 0 means reading PORT from the dotenv files
+    health_probe: HealthProbeType = HealthProbeType.NONE
+    health_log_pattern: str = "Application startup complete"
+    health_port: int = 0
+    health_http_path: str = "/"
+
+    @validator("health_log_pattern")
+    def check_health_log_pattern(cls, v: str) -> str:
+        try:
+            re.compile(v)
+        except re.error as err:
+            raise ValueError(f"invalid pattern: {err}")
+        return v
+
 
 class NonebotProjectList(BaseModel):
     projects: Dict[str, NonebotProjectMeta]
@@ -50,6 +75,10 @@ class AddProjectResponse(BaseModel):
     log_key: str
 
 
+class BulkOperationResponse(BaseModel):
+    log_key: str
+
+
 class ProjectListResponse(NonebotProjectList):
     ...
 
@@ -1,5 +1,6 @@
+import json
 import asyncio
-from typing import Tuple, Iterable, Optional
+from typing import Any, Dict, Tuple, Iterable, Optional
 
 from starlette.websockets import WebSocket, WebSocketState
 
@@ -7,6 +8,31 @@ from nb_cli_plugin_webui.utils.security import jwt
 from nb_cli_plugin_webui.core.configs.config import config
 from nb_cli_plugin_webui.exceptions import InvalidJWTTokenError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+DEFAULT_ENCODING = "json"
+SUBPROTOCOL_ENCODINGS: Dict[str, str] = {"nb-webui.json": "json"}
+if msgpack is not None:
+    SUBPROTOCOL_ENCODINGS = {"nb-webui.msgpack": "msgpack", **SUBPROTOCOL_ENCODINGS}
+
+
+def dump_json(data: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def get_encoding(websocket: WebSocket) -> str:
+    return getattr(websocket.state, "encoding", DEFAULT_ENCODING)
+
 
 async def accept(
     self: WebSocket,
@@ -14,6 +40,15 @@ async def accept(
     headers: Optional[Iterable[Tuple[bytes, bytes]]] = None,
 ) -> None:
     headers = headers or list()
+    if subprotocol is None:
+        for offered in self.scope.get("subprotocols", list()):
+            if offered in SUBPROTOCOL_ENCODINGS:
+                subprotocol = offered
+                break
+    self.state.encoding = SUBPROTOCOL_ENCODINGS.get(
+        subprotocol or str(), DEFAULT_ENCODING
+    )
+
     if self.client_state == WebSocketState.CONNECTING:
         await self.receive()
     await self.send(
@@ -34,4 +69,14 @@ async def accept(
         raise InvalidJWTTokenError
 
 
+async def send_data(self: WebSocket, data: Any) -> None:
+    """按握手时协商的编码发送数据"""
+
+    if get_encoding(self) == "msgpack":
+        await self.send_bytes(msgpack.packb(data))
+    else:
+        await self.send_text(dump_json(data))
+
+
 WebSocket.accept = accept
+WebSocket.send_data = send_data
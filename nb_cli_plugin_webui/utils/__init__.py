@@ -1,8 +1,9 @@
 import re
+import codecs
 import random
 import socket
 import string
-from typing import Any, List
+from typing import Any, List, Optional
 
 from ..i18n import _
 from ..exceptions import TokenComplexityError
@@ -68,11 +69,48 @@ def decode_parse(data: bytes) -> str:
     for encoding in encodings:
         try:
             decoded_data = data.decode(encoding)
+            break
         except UnicodeDecodeError:
             continue
     return decoded_data
 
 
+class StreamDecoder:
+    """流式解码器，在首次遇到非 ASCII 内容时确定编码，之后始终沿用"""
+
+    encodings = ("utf-8", "gbk")
+
+    def __init__(self) -> None:
+        self.decoder: Optional[codecs.IncrementalDecoder] = None
+        self._undecided = bytes()
+
+    def decode(self, data: bytes, final: bool = False) -> str:
+        if self.decoder is None:
+            data = self._undecided + data
+            self._undecided = bytes()
+            if data.isascii():
+                return data.decode("ascii")
+
+            decoder = self._detect(data, final)
+            if decoder is None:
+                self._undecided = data
+                return str()
+            self.decoder = decoder
+        return self.decoder.decode(data, final)
+
+    def _detect(self, data: bytes, final: bool) -> Optional[codecs.IncrementalDecoder]:
+        for encoding in self.encodings:
+            try:
+                text = codecs.getincrementaldecoder(encoding)().decode(data, final)
+            except UnicodeDecodeError:
+                continue
+            if text.isascii():
+                # Only an incomplete multi-byte sequence so far, wait for more data
+                return None
+            return codecs.getincrementaldecoder(encoding)("replace")
+        return codecs.getincrementaldecoder(self.encodings[0])("replace")
+
+
 def safe_list_get(_list: List[Any], _index: int, default: Any) -> Any:
     try:
         return _list[_index]
@@ -0,0 +1,129 @@
+import math
+from bisect import bisect_left
+from typing import Dict, List, Tuple, Iterable, Optional, Sequence
+
+MetricLabels = Dict[str, str]
+MetricSample = Tuple[str, MetricLabels, float]
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """按标签分组的累积直方图，仅记录计数，导出时再转换为 Prometheus 格式
+
+    Args:
+        - label_names (Sequence[str]): 标签名
+        - buckets (Sequence[float]): 桶上界，由小到大
+    """
+
+    def __init__(
+        self, label_names: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # Per label set: bucket counts (last one is +Inf), sum of observed values
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = dict()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = (
+                [0] * (len(self.buckets) + 1),
+                [0.0],
+            )
+
+        counts, total = series
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def collect(self) -> List[MetricSample]:
+        samples: List[MetricSample] = list()
+        bounds = [format_value(b) for b in self.buckets] + ["+Inf"]
+        for label_values, (counts, total) in self._series.items():
+            labels = dict(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                samples.append(("_bucket", {**labels, "le": bound}, cumulative))
+            samples.append(("_sum", labels, total[0]))
+            samples.append(("_count", labels, cumulative))
+        return samples
+
+
+class MetricsWriter:
+    """生成 Prometheus 文本格式的指标"""
+
+    content_type = "text/plain; version=0.0.4"
+
+    def __init__(self, namespace: str = str()) -> None:
+        self.namespace = namespace
+        self._lines: List[str] = list()
+
+    def add(
+        self,
+        name: str,
+        metric_type: str,
+        description: str,
+        samples: Iterable[MetricSample],
+    ) -> None:
+        """添加一个指标
+
+        Args:
+            - name (str): 指标名，会加上命名空间前缀
+            - metric_type (str): 指标类型，如 gauge、counter、histogram
+            - description (str): 指标说明
+            - samples (Iterable[MetricSample]): 名称后缀、标签及值
+        """
+
+        name = f"{self.namespace}_{name}" if self.namespace else name
+        lines = self._lines
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for suffix, labels, value in samples:
+            if labels:
+                label_text = ",".join(
+                    f'{k}="{escape_label_value(str(v))}"' for k, v in labels.items()
+                )
+                lines.append(f"{name}{suffix}{{{label_text}}} {format_value(value)}")
+            else:
+                lines.append(f"{name}{suffix} {format_value(value)}")
+
+    def add_value(
+        self,
+        name: str,
+        metric_type: str,
+        description: str,
+        value: Optional[float],
+        labels: Optional[MetricLabels] = None,
+    ) -> None:
+        if value is None:
+            return
+        self.add(name, metric_type, description, [(str(), labels or dict(), value)])
+
+    def render(self) -> str:
+        return "\n".join(self._lines) + "\n"
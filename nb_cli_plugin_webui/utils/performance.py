@@ -1,6 +1,6 @@
-import asyncio
 import platform
 from sys import platform as pf
+from typing import Dict, List, Optional
 
 import psutil
 
@@ -10,6 +10,7 @@ from nb_cli_plugin_webui.models.schemas.performance import (
     MemInfo,
     NetInfo,
     DiskInfo,
+    HostFacts,
     PlatformInfo,
 )
 
@@ -19,10 +20,11 @@ if pf == "win32":
     from win32com import client
 
 
-_LAST_DISK_IO = [0, 0]
-_NOW_DISK_IO = [0, 0]
-_LAST_NET_IO = [0, 0]
-_NOW_NET_IO = [0, 0]
+# Rates stay None until the counters have a previous sample to diff against
+_LAST_DISK_IO: Optional[List[int]] = None
+_NOW_DISK_IO: Optional[List[int]] = None
+_LAST_NET_IO: Optional[List[int]] = None
+_NOW_NET_IO: Optional[List[int]] = None
 
 
 @scheduler.scheduled_job("interval", seconds=1, misfire_grace_time=15)
@@ -31,12 +33,15 @@ async def get_disk_io():
 
     disk_counters = psutil.disk_io_counters()
     if disk_counters is None:
+        # No disk counters on this host, report a zero rate
+        _NOW_DISK_IO = [0, 0]
         return
 
-    _NOW_DISK_IO = [
-        disk_counters.read_bytes - _LAST_DISK_IO[0],
-        disk_counters.write_bytes - _LAST_DISK_IO[1],
-    ]
+    if _LAST_DISK_IO is not None:
+        _NOW_DISK_IO = [
+            disk_counters.read_bytes - _LAST_DISK_IO[0],
+            disk_counters.write_bytes - _LAST_DISK_IO[1],
+        ]
     _LAST_DISK_IO = [disk_counters.read_bytes, disk_counters.write_bytes]
 
 
@@ -45,53 +50,113 @@ async def get_net_io():
     global _LAST_NET_IO, _NOW_NET_IO
 
     net_counters = psutil.net_io_counters()
-    _NOW_NET_IO = [
-        net_counters.bytes_sent - _LAST_NET_IO[0],
-        net_counters.bytes_recv - _LAST_NET_IO[1],
-    ]
+    if _LAST_NET_IO is not None:
+        _NOW_NET_IO = [
+            net_counters.bytes_sent - _LAST_NET_IO[0],
+            net_counters.bytes_recv - _LAST_NET_IO[1],
+        ]
     _LAST_NET_IO = [net_counters.bytes_sent, net_counters.bytes_recv]
 
 
-class PerformanceMonitor:
-    """获取当前运行平台性能信息"""
+def get_host_metrics() -> Dict[str, float]:
+    """获取用于时间序列记录的主机指标，磁盘及网络速率取自最近一秒的计数差值，
+    尚无前一次计数时不包含对应的速率字段
+    """
 
-    @staticmethod
-    def get_platform_info() -> PlatformInfo:
-        return PlatformInfo(
-            name=platform.platform(),
-            struct=platform.architecture()[0],
-            platform_type=pf,
-        )
+    metrics: Dict[str, float] = {
+        # Total cpu_percent keeps its own baseline, separate from the percpu one
+        "cpu": psutil.cpu_percent(),
+        "mem": psutil.virtual_memory().percent,
+        "disk": psutil.disk_usage("/").percent,
+    }
+    if _NOW_DISK_IO is not None:
+        metrics["disk_read"], metrics["disk_write"] = _NOW_DISK_IO
+    if _NOW_NET_IO is not None:
+        metrics["net_sent"], metrics["net_recv"] = _NOW_NET_IO
+    return metrics
 
-    @staticmethod
-    async def get_cpu_info() -> CpuInfo:
+
+def get_io_totals() -> Dict[str, int]:
+    """获取定时任务最近一次读取的磁盘及网络累计字节数"""
+
+    disk_io = _LAST_DISK_IO or [0, 0]
+    net_io = _LAST_NET_IO or [0, 0]
+    return {
+        "disk_read": disk_io[0],
+        "disk_write": disk_io[1],
+        "net_sent": net_io[0],
+        "net_recv": net_io[1],
+    }
+
+
+class HostFactsCache:
+    """运行期间不会变化的主机信息，首次使用时获取并缓存，可手动刷新"""
+
+    facts: Optional[HostFacts] = None
+
+    @classmethod
+    def get(cls) -> HostFacts:
+        if cls.facts is None:
+            return cls.refresh()
+        return cls.facts
+
+    @classmethod
+    def refresh(cls) -> HostFacts:
         cpu_name = platform.processor()
+        disk_devices = ["/"]
         if pf == "win32":
             pythoncom.CoInitialize()
             winm = client.GetObject("winmgmts:root\cimv2")
             cpus = winm.ExecQuery("SELECT * FROM Win32_Processor")
             cpu_name = cpus[0].Name.strip()
+            disk_devices = [d.DeviceID for d in wmi.WMI().Win32_LogicalDisk()]
 
-        cpu_cores = psutil.cpu_count(False)
-        _freq = int()
         cpu_max_freq = "0"
+        if pf != "darwin":
+            _freq = psutil.cpu_freq()
+            if _freq is not None:
+                cpu_max_freq = f"{'%.2f'%(_freq.max / 1000)}"
+
+        cls.facts = HostFacts(
+            platform=PlatformInfo(
+                name=platform.platform(),
+                struct=platform.architecture()[0],
+                platform_type=pf,
+            ),
+            cpu_name=cpu_name,
+            cpu_count=psutil.cpu_count(False) or 0,
+            cpu_max_freq=cpu_max_freq,
+            disk_devices=disk_devices,
+        )
+        return cls.facts
+
+
+class PerformanceMonitor:
+    """获取当前运行平台性能信息，静态信息取自 `HostFactsCache`"""
+
+    @staticmethod
+    def get_platform_info() -> PlatformInfo:
+        return HostFactsCache.get().platform
+
+    @staticmethod
+    async def get_cpu_info() -> CpuInfo:
+        facts = HostFactsCache.get()
         cpu_current_freq = "0"
         if pf != "darwin":
             _freq = psutil.cpu_freq()
-            cpu_max_freq = f"{'%.2f'%(_freq.max / 1000)}"
-            cpu_current_freq = f"{'%.2f'%(_freq.current / 1000)}"
+            if _freq is not None:
+                cpu_current_freq = f"{'%.2f'%(_freq.current / 1000)}"
 
-        psutil.cpu_percent(percpu=True)
-        await asyncio.sleep(0.5)
+        # Measured since the previous call, the shared sampler calls it every tick
         raw_cpu_percent = psutil.cpu_percent(percpu=True)
         cpu_percent = sum(raw_cpu_percent) / len(raw_cpu_percent)
 
         process = len(psutil.pids())
 
         return CpuInfo(
-            name=cpu_name,
-            count=cpu_cores,
-            max_freq=cpu_max_freq,
+            name=facts.cpu_name,
+            count=facts.cpu_count,
+            max_freq=facts.cpu_max_freq,
             current_freq=cpu_current_freq,
             percent=cpu_percent,
             process=process,
@@ -114,23 +179,17 @@ class PerformanceMonitor:
         disk_total = int()
         disk_used = int()
         disk_free = int()
-        if pf == "win32":
-            pythoncom.CoInitialize()
-            w = wmi.WMI()
-            disk_list = [d.DeviceID for d in w.Win32_LogicalDisk()]
-            for i in disk_list:
-                disk = psutil.disk_usage(i)
-                disk_total += disk.total
-                disk_used += disk.used
-                disk_free += disk.free
-        else:
-            disk = psutil.disk_usage("/")
-            disk_total = disk.total
-            disk_used = disk.used
-            disk_free = disk.free
+        for device in HostFactsCache.get().disk_devices:
+            disk = psutil.disk_usage(device)
+            disk_total += disk.total
+            disk_used += disk.used
+            disk_free += disk.free
 
         return DiskInfo(
-            total=disk_total, used=disk_used, free=disk_free, speed=_NOW_DISK_IO
+            total=disk_total,
+            used=disk_used,
+            free=disk_free,
+            speed=_NOW_DISK_IO or [0, 0],
         )
 
     @staticmethod
@@ -141,5 +200,5 @@ class PerformanceMonitor:
             recv_total=net.bytes_recv,
             package_sent=net.packets_sent,
             package_recv=net.packets_recv,
-            speed=_NOW_NET_IO,
+            speed=_NOW_NET_IO or [0, 0],
         )
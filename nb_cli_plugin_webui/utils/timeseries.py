@@ -0,0 +1,231 @@
+import time
+from array import array
+from typing import Any, Dict, List, Tuple, Iterable, Iterator, Optional, Sequence
+
+TimeSeriesPoint = Tuple[float, Dict[str, float]]
+DEFAULT_TIERS: Tuple[Tuple[float, int], ...] = ((1, 600), (60, 1440), (60 * 60, 720))
+
+
+class TimeSeriesTier:
+    """固定容量的单层时间序列，以环形数值数组存储，同一时间桶内的采样取平均值"""
+
+    def __init__(self, fields: Sequence[str], resolution: float, capacity: int) -> None:
+        self.fields = tuple(fields)
+        self.resolution = resolution
+        self.capacity = capacity
+
+        self.times = array("d", bytes(8 * capacity))
+        self.values = {field: array("d", bytes(8 * capacity)) for field in self.fields}
+        self.head = 0
+        self.size = 0
+
+        self._bucket: Optional[float] = None
+        self._sums = [0.0] * len(self.fields)
+        self._count = 0
+
+    def add(self, ts: float, values: Dict[str, float]) -> None:
+        bucket = ts - ts % self.resolution
+        if self._bucket is not None and bucket != self._bucket:
+            self._flush()
+
+        self._bucket = bucket
+        sums = self._sums
+        for i, field in enumerate(self.fields):
+            sums[i] += values.get(field, 0)
+        self._count += 1
+
+    def _append(self, ts: float, values: Sequence[float]) -> None:
+        index = (self.head + self.size) % self.capacity
+        self.times[index] = ts
+        for field, value in zip(self.fields, values):
+            self.values[field][index] = value
+
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.head = (self.head + 1) % self.capacity
+
+    def _flush(self) -> None:
+        if self._bucket is None or not self._count:
+            return
+
+        count = self._count
+        self._append(self._bucket, [v / count for v in self._sums])
+        self._bucket = None
+        self._sums = [0.0] * len(self.fields)
+        self._count = 0
+
+    def get_pending(self) -> Optional[TimeSeriesPoint]:
+        """获取尚未结束的时间桶的当前平均值"""
+
+        if self._bucket is None or not self._count:
+            return None
+        count = self._count
+        return self._bucket, {
+            field: v / count for field, v in zip(self.fields, self._sums)
+        }
+
+    @property
+    def full(self) -> bool:
+        return self.size >= self.capacity
+
+    @property
+    def oldest(self) -> Optional[float]:
+        if self.size:
+            return self.times[self.head]
+        return self._bucket
+
+    def _indexes(self) -> Iterator[int]:
+        head, capacity = self.head, self.capacity
+        return ((head + i) % capacity for i in range(self.size))
+
+    def query(
+        self, start_time: Optional[float] = None, end_time: Optional[float] = None
+    ) -> List[TimeSeriesPoint]:
+        times, values = self.times, self.values
+        result: List[TimeSeriesPoint] = list()
+        for index in self._indexes():
+            ts = times[index]
+            if start_time is not None and ts < start_time:
+                continue
+            if end_time is not None and ts > end_time:
+                break
+            result.append((ts, {field: values[field][index] for field in self.fields}))
+
+        pending = self.get_pending()
+        if (
+            pending is not None
+            and (start_time is None or pending[0] >= start_time)
+            and (end_time is None or pending[0] <= end_time)
+        ):
+            result.append(pending)
+        return result
+
+    def dump(self) -> Dict[str, Any]:
+        indexes = list(self._indexes())
+        data: Dict[str, Any] = {
+            "resolution": self.resolution,
+            "times": [self.times[i] for i in indexes],
+            "values": {
+                field: [self.values[field][i] for i in indexes] for field in self.fields
+            },
+        }
+        if self._bucket is not None and self._count:
+            data["pending"] = {
+                "bucket": self._bucket,
+                "count": self._count,
+                "sums": dict(zip(self.fields, self._sums)),
+            }
+        return data
+
+    def load(self, data: Dict[str, Any]) -> None:
+        times: List[float] = data.get("times", list())
+        values: Dict[str, List[float]] = data.get("values", dict())
+        # Fields added since the dump was written are filled with 0
+        columns = [values.get(field, list()) for field in self.fields]
+        last = self.times[(self.head + self.size - 1) % self.capacity]
+        for i in range(max(len(times) - self.capacity, 0), len(times)):
+            # Keep the buffer in time order if samples were recorded already
+            if self.size and times[i] <= last:
+                continue
+            last = times[i]
+            self._append(
+                times[i], [column[i] if i < len(column) else 0 for column in columns]
+            )
+
+        pending = data.get("pending")
+        if pending and not (self.size and pending["bucket"] <= last):
+            self._load_pending(pending)
+
+    def _load_pending(self, pending: Dict[str, Any]) -> None:
+        bucket: float = pending["bucket"]
+        count: int = pending["count"]
+        sums: Dict[str, float] = pending.get("sums", dict())
+        values = [sums.get(field, 0) for field in self.fields]
+        if not count:
+            return
+
+        if self._bucket is None:
+            self._bucket, self._sums, self._count = bucket, values, count
+        elif bucket == self._bucket:
+            # Samples of the same bucket were recorded before loading
+            self._sums = [a + b for a, b in zip(self._sums, values)]
+            self._count += count
+        elif bucket < self._bucket:
+            self._append(bucket, [v / count for v in values])
+
+
+class TieredTimeSeries:
+    """多精度时间序列，每次采样同时写入各层，查询时选择能覆盖起始时间的最细层
+
+    Args:
+        - fields (Sequence[str]): 记录的数值字段
+        - tiers (Iterable[Tuple[float, int]]): 每层的时间精度（秒）及容量，由细到粗
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str],
+        tiers: Iterable[Tuple[float, int]] = DEFAULT_TIERS,
+    ) -> None:
+        self.fields = tuple(fields)
+        self.tiers = [
+            TimeSeriesTier(self.fields, resolution, capacity)
+            for resolution, capacity in tiers
+        ]
+
+    def add(self, values: Dict[str, float], ts: Optional[float] = None) -> None:
+        ts = time.time() if ts is None else ts
+        for tier in self.tiers:
+            tier.add(ts, values)
+
+    def select_tier(
+        self, start_time: Optional[float] = None, resolution: Optional[float] = None
+    ) -> TimeSeriesTier:
+        if resolution is not None:
+            for tier in self.tiers:
+                if tier.resolution >= resolution:
+                    return tier
+            return self.tiers[-1]
+
+        for tier in self.tiers:
+            # A full tier may already have rotated out the requested start
+            oldest = tier.oldest
+            if not tier.full or (
+                start_time is not None and oldest is not None and oldest <= start_time
+            ):
+                return tier
+        return self.tiers[-1]
+
+    def query(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        resolution: Optional[float] = None,
+    ) -> Tuple[float, List[TimeSeriesPoint]]:
+        """按时间范围查询
+
+        Args:
+            - start_time (Optional[float]): 起始时间戳
+            - end_time (Optional[float]): 结束时间戳
+            - resolution (Optional[float]): 期望的最低精度（秒），为空时自动选择
+
+        Returns:
+            Tuple[float, List[TimeSeriesPoint]]: 所用层的精度及范围内的数据点
+        """
+
+        tier = self.select_tier(start_time, resolution)
+        return tier.resolution, tier.query(start_time, end_time)
+
+    def dump(self) -> Dict[str, Any]:
+        """导出各层的数据及尚未结束的时间桶，用于持久化"""
+
+        return {"fields": self.fields, "tiers": [tier.dump() for tier in self.tiers]}
+
+    def load(self, data: Dict[str, Any]) -> None:
+        """载入 `dump` 导出的数据，精度不匹配的层将被忽略"""
+
+        tiers = {tier.get("resolution"): tier for tier in data.get("tiers", list())}
+        for tier in self.tiers:
+            if tier.resolution in tiers:
+                tier.load(tiers[tier.resolution])
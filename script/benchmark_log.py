@@ -0,0 +1,180 @@
+"""日志链路吞吐基准测试
+
+启动一个持续输出 NoneBot 格式日志的子进程，经由 `CustomProcessor` → `LoggerStorage`
+→ 模拟的 WebSocket 订阅者，统计吞吐量、端到端延迟、事件循环延迟及内存峰值。
+
+在项目根目录下运行：
+
+    python ./script/benchmark_log.py --lines 200000 --listeners 10
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import resource
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Type
+
+ROOT_PATH = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_PATH))
+
+if TYPE_CHECKING:
+    from nb_cli_plugin_webui.api.dependencies.process.process import CustomProcessor
+
+CHILD_SCRIPT = """
+import sys, time
+lines, rate = int(sys.argv[1]), float(sys.argv[2])
+write = sys.stdout.write
+start = time.time()
+for i in range(lines):
+    if rate:
+        delay = start + i / rate - time.time()
+        if delay > 0:
+            time.sleep(delay)
+    write(
+        "\\x1b[32m10-17 12:00:00\\x1b[0m [\\x1b[1mINFO\\x1b[0m] "
+        f"\\x1b[36m\\x1b[4mnonebot\\x1b[0m | bench {i} {time.time()!r} payload\\n"
+    )
+    if i % 64 == 0:
+        sys.stdout.flush()
+"""
+
+
+def load_processor(data_dir: Path) -> Type["CustomProcessor"]:
+    """导入 `CustomProcessor`，并将数据目录指向临时目录"""
+
+    from nb_cli_plugin_webui.utils import store
+
+    # Keep the registry and archives written during the run out of the user's data
+    store.BASE_DATA_DIR = data_dir / "data"
+    store.BASE_CACHE_DIR = data_dir / "cache"
+    store.BASE_CONFIG_DIR = data_dir / "config"
+
+    from nb_cli_plugin_webui.api.dependencies.process.process import CustomProcessor
+
+    return CustomProcessor
+
+
+def percentile(data: List[float], percent: float) -> float:
+    if not data:
+        return 0.0
+    data = sorted(data)
+    return data[min(len(data) - 1, int(len(data) * percent / 100))]
+
+
+async def measure_loop_lag(lags: List[float], interval: float = 0.01) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def fake_listener(
+    processor: "CustomProcessor",
+    latencies: List[float],
+    received: List[int],
+    send_delay: float,
+) -> None:
+    subscriber = processor.logs.subscribe()
+    try:
+        while True:
+            dropped, logs = await subscriber.get_batch()
+            now = time.time()
+            # Same work as the websocket route: one joined JSON frame per batch
+            _ = f"[{','.join(log.json() for log in logs)}]"
+            # Oldest and newest line of each batch bound the latency of the rest
+            for log in {id(logs[0]): logs[0], id(logs[-1]): logs[-1]}.values():
+                parts = log.message.split()
+                if len(parts) > 3 and parts[-4] == "bench":
+                    latencies.append(now - float(parts[-2]))
+            received[0] += len(logs)
+            received[1] += dropped
+            if send_delay:
+                await asyncio.sleep(send_delay)
+    finally:
+        processor.logs.unsubscribe(subscriber)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    latencies: List[float] = list()
+    loop_lags: List[float] = list()
+    received = [0, 0]
+
+    with tempfile.TemporaryDirectory() as cwd:
+        CustomProcessor = load_processor(Path(cwd))
+        processor = CustomProcessor(
+            sys.executable,
+            "-c",
+            CHILD_SCRIPT,
+            str(args.lines),
+            str(args.rate),
+            cwd=Path(cwd),
+            log_max_count=args.max_count,
+            chunked_output=not args.line_mode,
+        )
+
+        lag_task = asyncio.create_task(measure_loop_lag(loop_lags))
+        listener_tasks = [
+            asyncio.create_task(
+                fake_listener(processor, latencies, received, args.send_delay)
+            )
+            for _ in range(args.listeners)
+        ]
+
+        start = time.perf_counter()
+        await processor.start()
+        assert processor.process and processor.output_task
+        await processor.process.wait()
+        await processor.output_task
+        elapsed = time.perf_counter() - start
+
+        # Let listeners drain their last batch
+        await asyncio.sleep(0.5)
+        ingested = processor.logs.last_seq
+        for task in (lag_task, *listener_tasks):
+            task.cancel()
+        await processor.stop()
+
+    return {
+        "lines": ingested,
+        "elapsed": elapsed,
+        "lines_per_sec": ingested / elapsed if elapsed else 0.0,
+        "listeners": args.listeners,
+        "delivered": received[0],
+        "dropped": received[1],
+        "latency_mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "latency_p50_ms": percentile(latencies, 50) * 1000,
+        "latency_p99_ms": percentile(latencies, 99) * 1000,
+        "loop_lag_p50_ms": percentile(loop_lags, 50) * 1000,
+        "loop_lag_p99_ms": percentile(loop_lags, 99) * 1000,
+        "loop_lag_max_ms": max(loop_lags, default=0.0) * 1000,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100000, help="子进程输出行数")
+    parser.add_argument("--rate", type=float, default=0, help="每秒输出行数，0 为不限速")
+    parser.add_argument("--listeners", type=int, default=5, help="模拟订阅者数量")
+    parser.add_argument("--send-delay", type=float, default=0, help="订阅者每批发送耗时（秒）")
+    parser.add_argument("--max-count", type=int, default=10000, help="日志缓冲区容量")
+    parser.add_argument("--line-mode", action="store_true", help="使用逐行读取模式")
+    parser.add_argument("--json", action="store_true", help="以 JSON 格式输出结果")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result))
+        return
+
+    for k, v in result.items():
+        print(f"{k:<18} {v:.2f}" if isinstance(v, float) else f"{k:<18} {v}")
+
+
+if __name__ == "__main__":
+    main()
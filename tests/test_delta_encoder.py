@@ -0,0 +1,57 @@
+from nb_cli_plugin_webui.api.dependencies.performance import (
+    SystemStatsDeltaEncoder,
+    flatten_stats,
+    unflatten_stats,
+)
+
+STATS = {
+    "cpu": {"percent": 10.0, "count": 4},
+    "mem": {"percent": 50.0, "total": 1024},
+    "net": {"speed": [1, 2]},
+}
+
+
+def test_flatten_round_trip():
+    flat = flatten_stats(STATS)
+    assert flat["cpu.percent"] == 10.0
+    # Lists are kept as a single value
+    assert flat["net.speed"] == [1, 2]
+    assert unflatten_stats(flat) == STATS
+
+
+def test_first_frame_is_full_then_only_changes():
+    encoder = SystemStatsDeltaEncoder()
+    assert encoder.encode(flatten_stats(STATS)) == {
+        "full": True,
+        "system_stats": STATS,
+    }
+
+    changed = flatten_stats(STATS)
+    changed["mem.percent"] = 55.0
+    changed["net.speed"] = [3, 4]
+    assert encoder.encode(changed) == {
+        "full": False,
+        "system_stats": {"mem": {"percent": 55.0}, "net": {"speed": [3, 4]}},
+    }
+
+
+def test_no_change_returns_none():
+    encoder = SystemStatsDeltaEncoder()
+    encoder.encode(flatten_stats(STATS))
+    assert encoder.encode(flatten_stats(STATS)) is None
+
+
+def test_fields_select_prefixes():
+    encoder = SystemStatsDeltaEncoder(["cpu", " mem.percent ", ""])
+    assert encoder.encode(flatten_stats(STATS)) == {
+        "full": True,
+        "system_stats": {
+            "cpu": {"percent": 10.0, "count": 4},
+            "mem": {"percent": 50.0},
+        },
+    }
+
+    changed = flatten_stats(STATS)
+    changed["mem.total"] = 2048
+    # Changes outside the selected fields are not sent
+    assert encoder.encode(changed) is None
@@ -0,0 +1,144 @@
+import asyncio
+from typing import List
+
+from nb_cli_plugin_webui.models.domain.process import LogLevel, LogRecord
+from nb_cli_plugin_webui.api.dependencies.process.log import (
+    COMPACT_THRESHOLD,
+    LoggerStorage,
+)
+
+
+def make_storage(max_count: int = 0, **kwargs) -> LoggerStorage[LogRecord]:
+    return LoggerStorage[LogRecord](rotation_time=0, max_count=max_count, **kwargs)
+
+
+def fill(storage: LoggerStorage[LogRecord], count: int, **kwargs) -> None:
+    logs = [LogRecord(f"line {i}", **kwargs) for i in range(count)]
+    asyncio.run(storage.add_logs(logs))
+
+
+def seqs(logs: List[LogRecord]) -> List[int]:
+    return [log.seq for log in logs]  # type: ignore
+
+
+def test_seq_is_assigned_in_order():
+    storage = make_storage()
+    asyncio.run(storage.add_log(LogRecord("first")))
+    fill(storage, 3)
+
+    assert seqs(storage.get_logs()) == [1, 2, 3, 4]
+    assert storage.first_seq == 1
+    assert storage.last_seq == 4
+    assert storage.get_logs()[0].dict()["seq"] == 1
+
+
+def test_evict_by_count_keeps_seq():
+    storage = make_storage(max_count=10)
+    fill(storage, 25)
+
+    assert storage.get_count() == 10
+    assert storage.first_seq == 16
+    assert storage.last_seq == 25
+    assert storage.total_count == 25
+    assert seqs(storage.get_logs()) == list(range(16, 26))
+
+
+def test_compaction_keeps_content():
+    storage = make_storage(max_count=10)
+    for _ in range(3):
+        fill(storage, COMPACT_THRESHOLD)
+
+    # Evicted slots are dropped from the list once they dominate it
+    assert len(storage._logs) < 3 * COMPACT_THRESHOLD
+    assert seqs(storage.get_logs()) == list(
+        range(3 * COMPACT_THRESHOLD - 9, 3 * COMPACT_THRESHOLD + 1)
+    )
+
+
+def test_get_logs_limit_and_reverse():
+    storage = make_storage()
+    fill(storage, 10)
+
+    assert seqs(storage.get_logs(limit=3)) == [8, 9, 10]
+    assert seqs(storage.get_logs(reverse=True, limit=3)) == [3, 2, 1]
+
+
+def test_slice_since_seq_returns_oldest_first():
+    storage = make_storage()
+    fill(storage, 10)
+
+    first, last, logs = storage.get_logs_slice(since_seq=4, limit=3)
+    assert (first, last) == (5, 7)
+    assert seqs(logs) == [5, 6, 7]
+
+    # Resuming from the returned cursor continues without gaps
+    first, last, logs = storage.get_logs_slice(since_seq=last)
+    assert (first, last) == (8, 10)
+    assert seqs(logs) == [8, 9, 10]
+
+
+def test_slice_before_seq_returns_newest_first():
+    storage = make_storage()
+    fill(storage, 10)
+
+    first, last, logs = storage.get_logs_slice(before_seq=8, limit=3)
+    assert (first, last) == (5, 7)
+    assert seqs(logs) == [5, 6, 7]
+
+    first, last, logs = storage.get_logs_slice(limit=2)
+    assert (first, last) == (9, 10)
+
+
+def test_slice_after_eviction_is_clamped():
+    storage = make_storage(max_count=5)
+    fill(storage, 10)
+
+    first, last, logs = storage.get_logs_slice(since_seq=1)
+    assert (first, last) == (6, 10)
+    assert seqs(logs) == [6, 7, 8, 9, 10]
+
+    first, last, logs = storage.get_logs_slice(since_seq=10)
+    assert logs == list()
+
+
+def test_slice_with_levels_advances_cursor_over_scanned_logs():
+    storage = make_storage()
+    logs = [
+        LogRecord(str(i), level=LogLevel.ERROR if i % 3 == 0 else LogLevel.INFO)
+        for i in range(1, 11)
+    ]
+    asyncio.run(storage.add_logs(logs))
+
+    first, last, result = storage.get_logs_slice(
+        since_seq=0, limit=2, levels=[LogLevel.ERROR]
+    )
+    assert seqs(result) == [3, 6]
+    assert (first, last) == (1, 6)
+
+    first, last, result = storage.get_logs_slice(
+        since_seq=last, levels=[LogLevel.ERROR]
+    )
+    assert seqs(result) == [9]
+    assert (first, last) == (7, 10)
+
+
+def test_search_index_follows_eviction():
+    storage = make_storage(max_count=3, searchable=True)
+    fill(storage, 3)
+    asyncio.run(storage.add_log(LogRecord("needle here")))
+    fill(storage, 2)
+
+    assert [seq for seq, _ in storage.search("needle")] == [4]
+
+    fill(storage, 3)
+    assert storage.search("needle") == list()
+
+
+def test_subscriber_drops_oldest_when_full():
+    storage = make_storage()
+    subscriber = storage.subscribe(max_size=3, flush_interval=0)
+    fill(storage, 5)
+
+    dropped, logs = asyncio.run(subscriber.get_batch())
+    assert dropped == 2
+    assert seqs(logs) == [3, 4, 5]
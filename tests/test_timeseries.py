@@ -0,0 +1,89 @@
+import json
+
+from nb_cli_plugin_webui.utils.timeseries import TimeSeriesTier, TieredTimeSeries
+
+TIERS = ((1, 10), (60, 10), (3600, 10))
+
+
+def test_tier_averages_samples_in_a_bucket():
+    tier = TimeSeriesTier(("x",), resolution=10, capacity=5)
+    tier.add(100, {"x": 1})
+    tier.add(105, {"x": 3})
+    tier.add(110, {"x": 10})
+
+    assert tier.query() == [(100, {"x": 2}), (110, {"x": 10})]
+
+
+def test_tier_is_a_ring_buffer():
+    tier = TimeSeriesTier(("x",), resolution=1, capacity=3)
+    for ts in range(6):
+        tier.add(ts, {"x": ts})
+
+    # Buckets 2..4 are closed, bucket 5 is still open
+    assert [ts for ts, _ in tier.query()] == [2, 3, 4, 5]
+    assert tier.full
+    assert tier.oldest == 2
+
+
+def test_tier_query_range():
+    tier = TimeSeriesTier(("x",), resolution=1, capacity=10)
+    for ts in range(8):
+        tier.add(ts, {"x": ts})
+
+    assert [ts for ts, _ in tier.query(start_time=3, end_time=5)] == [3, 4, 5]
+
+
+def test_select_tier_falls_back_to_coarser_tiers():
+    series = TieredTimeSeries(("x",), TIERS)
+    for ts in range(0, 200):
+        series.add({"x": 1}, ts=ts)
+
+    resolution, _ = series.query(start_time=195)
+    assert resolution == 1
+    resolution, _ = series.query(start_time=0)
+    assert resolution == 60
+    resolution, _ = series.query(resolution=30)
+    assert resolution == 60
+
+
+def test_dump_and_load_round_trip():
+    series = TieredTimeSeries(("x", "y"), TIERS)
+    for ts in range(7200, 7200 + 125):
+        series.add({"x": 2, "y": ts}, ts=ts)
+
+    restored = TieredTimeSeries(("x", "y"), TIERS)
+    restored.load(json.loads(json.dumps(series.dump())))
+
+    for resolution in (1, 60, 3600):
+        assert restored.query(resolution=resolution) == series.query(
+            resolution=resolution
+        )
+
+
+def test_load_merges_the_open_bucket():
+    series = TieredTimeSeries(("x",), TIERS)
+    for ts in range(7200, 7200 + 120):
+        series.add({"x": 2}, ts=ts)
+    data = series.dump()
+
+    # Samples taken after the restart land in the same hour bucket
+    restored = TieredTimeSeries(("x",), TIERS)
+    restored.add({"x": 4}, ts=7200 + 130)
+    restored.load(data)
+
+    _, points = restored.query(resolution=3600)
+    assert points == [(7200, {"x": (120 * 2 + 4) / 121})]
+
+
+def test_load_ignores_unknown_tiers_and_fills_new_fields():
+    old = TieredTimeSeries(("x",), ((1, 10),))
+    for ts in range(5):
+        old.add({"x": 1}, ts=ts)
+
+    series = TieredTimeSeries(("x", "y"), ((1, 10), (30, 10)))
+    series.load(old.dump())
+
+    _, points = series.query(resolution=1)
+    assert points[0] == (0, {"x": 1, "y": 0})
+    _, points = series.query(resolution=30)
+    assert points == list()